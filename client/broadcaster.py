@@ -0,0 +1,135 @@
+from client.ratelimit import (RateLimitedError, RequestScheduler, PRIORITY_SEND, INITIAL_BACKOFF,
+                              parse_retry_after, is_throttled_response)
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+import aiohttp
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Ответы ноды, означающие, что транзакция уже находится в её mempool
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "alreadyknown", "already imported")
+
+
+class Broadcaster:
+    """
+    Рассылает подписанную транзакцию на все RPC одновременно.
+
+    Успехом считается первый принявший эндпоинт (в том числе ответ "already known");
+    остальные запросы досылаются в фоне. Для каждого эндпоинта копится статистика:
+    сколько раз он принял транзакцию первым и с какой задержкой отвечал. Если заданы
+    планировщики эндпоинтов, отправка занимает их токены с наивысшим приоритетом.
+    """
+
+    def __init__(self, rpc_urls: List[str], proxy: Optional[str] = None, timeout: int = 10,
+                 schedulers: Optional[Dict[str, RequestScheduler]] = None):
+        self.rpc_urls = list(dict.fromkeys(rpc_urls))
+        self.proxy = f"http://{proxy}" if proxy else None
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.first_accepts: Counter = Counter()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.failures: Counter = Counter()
+        self.schedulers = schedulers or {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pending: set = set()
+
+    # Общая сессия: соединения с эндпоинтами переиспользуются между транзакциями
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        return self._session
+
+    # Отправка транзакции на один эндпоинт
+    async def _send(self, rpc_url: str, raw_tx_hex: str) -> str:
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_sendRawTransaction", "params": [raw_tx_hex]}
+        scheduler = self.schedulers.get(rpc_url)
+        if scheduler:
+            await scheduler.acquire(PRIORITY_SEND)
+        started = time.perf_counter()
+        try:
+            async with self.session.post(rpc_url, json=payload, proxy=self.proxy) as response:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                data = None if response.status == 429 else await response.json(content_type=None)
+        except Exception:
+            self.failures[rpc_url] += 1
+            raise
+
+        self.latencies[rpc_url].append(time.perf_counter() - started)
+        # Эндпоинт ограничивает запросы — транзакцию примут остальные
+        if data is None or is_throttled_response(data):
+            self.failures[rpc_url] += 1
+            if scheduler:
+                scheduler.throttle(retry_after or INITIAL_BACKOFF)
+            raise RateLimitedError(rpc_url, retry_after)
+        if scheduler:
+            scheduler.release()
+
+        error = data.get("error")
+        if error:
+            message = str(error.get("message", error))
+            if any(marker in message.lower() for marker in ALREADY_KNOWN_ERRORS):
+                return rpc_url
+            self.failures[rpc_url] += 1
+            raise ValueError(f"{rpc_url}: {message}")
+        return rpc_url
+
+    async def _send_all(self, raw_tx_hex: str, accepted: asyncio.Future) -> None:
+        errors = []
+        tasks = [asyncio.create_task(self._send(rpc_url, raw_tx_hex)) for rpc_url in self.rpc_urls]
+        for task in asyncio.as_completed(tasks):
+            try:
+                rpc_url = await task
+            except Exception as e:
+                errors.append(e)
+                continue
+            if not accepted.done():
+                self.first_accepts[rpc_url] += 1
+                accepted.set_result(rpc_url)
+
+        if not accepted.done():
+            if errors and all(isinstance(error, RateLimitedError) for error in errors):
+                accepted.set_exception(errors[0])
+            else:
+                accepted.set_exception(ValueError(f"Ни один RPC не принял транзакцию: {errors}"))
+
+    # Рассылка транзакции на все эндпоинты
+    async def send_raw_transaction(self, raw_tx: bytes, tx_hash: str) -> str:
+        raw_tx_hex = raw_tx.hex() if isinstance(raw_tx, bytes) else raw_tx
+        if not raw_tx_hex.startswith("0x"):
+            raw_tx_hex = f"0x{raw_tx_hex}"
+
+        accepted = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(self._send_all(raw_tx_hex, accepted))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+        rpc_url = await accepted
+        logger.info(f"📡 Транзакция {tx_hash} первой принята {rpc_url}")
+        return tx_hash
+
+    # Ожидание фоновых отправок (перед завершением процесса)
+    async def drain(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    # Завершение фоновых отправок и закрытие сессии
+    async def close(self) -> None:
+        await self.drain()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def stats(self) -> Dict[str, dict]:
+        """Сводка по эндпоинтам: первые принятия, средняя задержка и ошибки"""
+        return {
+            rpc_url: {
+                "first_accepts": self.first_accepts[rpc_url],
+                "avg_latency": (sum(self.latencies[rpc_url]) / len(self.latencies[rpc_url])
+                                if self.latencies[rpc_url] else None),
+                "failures": self.failures[rpc_url],
+            }
+            for rpc_url in self.rpc_urls
+        }
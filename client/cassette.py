@@ -0,0 +1,168 @@
+from web3.providers.async_base import AsyncBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import asyncio
+import logging
+import gzip
+import sys
+import json
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class RecordedError(Exception):
+    """Записанное исключение, тип которого не удалось восстановить при воспроизведении"""
+
+    def __init__(self, error_type: str, message: str):
+        self.error_type = error_type
+        super().__init__(f"{error_type}: {message}")
+
+
+# Исключение провайдера в виде, пригодном для записи в кассету
+def dump_error(error: BaseException) -> dict:
+    cls = type(error)
+    attributes = {name: value for name, value in vars(error).items()
+                  if not name.startswith("_") and isinstance(value, (str, int, float, bool, type(None)))}
+    return {
+        "type": f"{cls.__module__}:{cls.__qualname__}",
+        "args": [arg if isinstance(arg, (str, int, float, bool, type(None))) else str(arg) for arg in error.args],
+        "attrs": attributes,
+        "message": str(error),
+    }
+
+
+# Восстановление записанного исключения того же типа, с теми же аргументами и полями
+def load_error(data: dict) -> Exception:
+    module_name, _, qualname = data["type"].partition(":")
+    # Типы ищутся только среди уже загруженных модулей: кассета не должна ничего импортировать
+    cls = sys.modules.get(module_name)
+    for name in qualname.split("."):
+        cls = getattr(cls, name, None)
+
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        try:
+            # Конструктор в обход __init__: у исключений вроде RateLimitedError свои аргументы
+            error = cls.__new__(cls, *data["args"])
+            Exception.__init__(error, *data["args"])
+            for name, value in data["attrs"].items():
+                setattr(error, name, value)
+            if str(error) == data["message"]:
+                return error
+        except Exception:
+            pass
+    return RecordedError(data["type"], data["message"])
+
+
+class Cassette:
+    """
+    Файл с записью JSON-RPC запросов и ответов (JSON Lines, сжатый gzip).
+
+    Каждая строка: метод `m`, параметры `p`, ответ `r` (или исключение `e`), смещение
+    от начала записи `t` и время ответа `d` в секундах. В режиме воспроизведения ответы
+    выдаются по ключу (метод, параметры) в порядке записи; когда записи по ключу
+    заканчиваются, повторяется последний ответ (так работают опросы receipt и баланса).
+    Записанные исключения (таймауты, обрывы, ограничения RPC) выбрасываются повторно.
+    """
+
+    def __init__(self, path: str, mode: str = RECORD, simulate_latency: bool = False):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Неизвестный режим кассеты: {mode}")
+        self.path = path
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self.started_at = time.perf_counter()
+        self._file = None
+        self._responses: Dict[Tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str], dict] = {}
+
+        if mode == RECORD:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self.load()
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> Optional["Cassette"]:
+        """Создаёт кассету по секции `cassette` из settings.json, если она задана"""
+        cassette_settings = settings.get("cassette")
+        if not cassette_settings:
+            return None
+        return cls(cassette_settings["path"], cassette_settings.get("mode", RECORD),
+                   cassette_settings.get("simulate_latency", False))
+
+    @staticmethod
+    def key(method: str, params: Any) -> Tuple[str, str]:
+        return method, json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+    def load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as file:
+            for line in file:
+                entry = json.loads(line)
+                self._responses[self.key(entry["m"], entry["p"])].append(entry)
+        logger.info(f"📼 Загружена кассета {self.path}: {sum(map(len, self._responses.values()))} ответов")
+
+    def record(self, method: str, params: Any, response: Optional[RPCResponse], started_at: float, elapsed: float,
+               error: Optional[BaseException] = None) -> None:
+        entry = {
+            "m": method,
+            "p": params,
+            "t": round(started_at - self.started_at, 6),
+            "d": round(elapsed, 6),
+        }
+        if error is None:
+            entry["r"] = response
+        else:
+            entry["e"] = dump_error(error)
+        self._file.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+
+    def lookup(self, method: str, params: Any) -> dict:
+        key = self.key(method, params)
+        queue = self._responses.get(key)
+        if queue:
+            self._last[key] = queue.popleft()
+        if key not in self._last:
+            raise KeyError(f"Нет записанного ответа для {method} {key[1]}")
+        return self._last[key]
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class CassetteProvider(AsyncBaseProvider):
+    """Обёртка над провайдером: пишет ответы в кассету или отдаёт их из неё без сети"""
+
+    def __init__(self, provider: Optional[AsyncBaseProvider], cassette: Cassette):
+        super().__init__()
+        self.provider = provider
+        self.cassette = cassette
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self.cassette.mode == REPLAY:
+            entry = self.cassette.lookup(method, params)
+            if self.cassette.simulate_latency:
+                await asyncio.sleep(entry["d"])
+            if "e" in entry:
+                raise load_error(entry["e"])
+            return entry["r"]
+
+        started_at = time.perf_counter()
+        try:
+            response = await self.provider.make_request(method, params)
+        except Exception as e:
+            self.cassette.record(method, params, None, started_at, time.perf_counter() - started_at, e)
+            raise
+        self.cassette.record(method, params, response, started_at, time.perf_counter() - started_at)
+        return response
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        if self.cassette.mode == REPLAY:
+            return True
+        return await self.provider.is_connected(show_traceback)
@@ -1,23 +1,24 @@
 from functools import wraps
 from aiohttp import ClientHttpProxyError
 from eth_account import Account
-from web3.middleware.geth_poa import async_geth_poa_middleware
 from web3.exceptions import TransactionNotFound
-from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3 import AsyncWeb3
 from web3.contract import AsyncContract
 from typing import Optional, Union
 from web3.types import TxParams
 from hexbytes import HexBytes
+from client.broadcaster import Broadcaster
+from client.ratelimit import RateLimitedError
+from client.engine import ChainEngine, WalletContext, ERC20_ABI
 from client.networks import Network
+from utils.wrappers import wrap_native_token, unwrap_native_token
+from utils.amount import AmountLike, TokenAmount
 import asyncio
 import logging
-import json
-from decimal import Decimal
-
-with open("abi/erc20_abi.json", "r", encoding="utf-8") as file:
-    ERC20_ABI = json.load(file)
 
 logger = logging.getLogger(__name__)
+
+FEE_FIELDS = ("maxFeePerGas", "maxPriorityFeePerGas", "type", "gasPrice")
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
@@ -56,42 +57,85 @@ def retry_on_proxy_error(max_attempts: int = 3, fallback_no_proxy: bool = True):
 
 
 class Client:
-    def __init__(self, pool_address: str, chain_id: int, rpc_url: str, private_key: str,
-                 amount: float, explorer_url: str, usdc_address: str, proxy: Optional[str] = None):
-        request_kwargs = {"proxy": f"http://{proxy}"} if proxy else {}
-        self.explorer_url = explorer_url
-        self.private_key = private_key
-        self.account = Account.from_key(self.private_key)
-        self.pool_address = pool_address
-        self.usdc_address = usdc_address
-        self.chain_id = chain_id
-        self.amount = amount
-        self.rpc_url = rpc_url
-        self.proxy = proxy
-
-        # Определяем сеть
-        if isinstance(chain_id, str):
-            self.network = Network.from_name(chain_id)
-        else:
-            self.network = Network.from_chain_id(chain_id)
+    """
+    Клиент кошелька: лёгкая обёртка над общим движком сети и контекстом кошелька.
+
+    Все подключения, контракты и кэши живут в `ChainEngine`, поэтому клиент
+    для каждого из тысяч кошельков создаётся мгновенно и почти не занимает память.
+    """
+
+    __slots__ = ("engine", "wallet")
+
+    def __init__(self, engine: ChainEngine, wallet: WalletContext):
+        self.engine = engine
+        self.wallet = wallet
+
+    @property
+    def address(self) -> str:
+        return self.wallet.address
+
+    @property
+    def private_key(self) -> bytes:
+        return self.wallet.key
+
+    @property
+    def proxy(self) -> Optional[str]:
+        return self.wallet.proxy
+
+    @property
+    def network(self) -> Network:
+        return self.engine.network
 
-        self.chain_id = self.network.chain_id
+    @property
+    def chain_id(self) -> int:
+        return self.engine.chain_id
 
-        # Инициализация AsyncWeb3
-        self.w3 = AsyncWeb3(AsyncHTTPProvider(rpc_url, request_kwargs=request_kwargs))
-        # Применяем middleware для PoA-сетей
-        if self.network.is_poa:
-            self.w3.middleware_onion.clear()
-            self.w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+    @property
+    def pool_address(self) -> str:
+        return self.engine.pool_address
 
-        self.eip_1559 = True
-        self.address = self.w3.to_checksum_address(
-            self.w3.eth.account.from_key(self.private_key).address)
+    @property
+    def usdc_address(self) -> str:
+        return self.engine.usdc_address
+
+    @property
+    def explorer_url(self) -> str:
+        return self.engine.explorer_url
+
+    @property
+    def eip_1559(self) -> bool:
+        return self.engine.eip_1559
+
+    @property
+    def w3(self) -> AsyncWeb3:
+        return self.engine.w3(self.wallet.proxy)
+
+    @property
+    def broadcaster(self) -> Optional[Broadcaster]:
+        return self.engine.broadcaster_for(self.wallet.proxy)
+
+    # Значение, актуальное в пределах текущего блока
+    async def per_block(self, key: str, factory):
+        return await self.engine.per_block(key, factory)
+
+    # Ожидание следующего блока (или паузы, если транспорт не подключён)
+    async def wait_next_block(self, timeout: float) -> None:
+        await self.engine.wait_next_block(timeout)
+
+    # Следующий nonce кошелька (запрашивается один раз, дальше ведётся локально)
+    async def get_nonce(self) -> int:
+        if self.wallet.nonce is None:
+            self.wallet.nonce = await self.w3.eth.get_transaction_count(self.address, "pending")
+        return self.wallet.nonce
+
+    # Подпись транзакции ключом кошелька
+    def sign(self, transaction: TxParams):
+        return Account.sign_transaction(transaction, self.wallet.key)
 
     # Получение баланса нативного токена
     async def get_native_balance(self) -> float:
         """Получает баланс нативного токена в ETH/BNB/MATIC и т.д."""
-        balance_wei = await self.w3.eth.get_balance(self.address)
+        balance_wei = await self.per_block(f"balance:{self.address}", lambda: self.w3.eth.get_balance(self.address))
         return balance_wei
 
     async def get_allowance(self, token_address: str, owner: str, spender: str) -> int:
@@ -102,54 +146,56 @@ class Client:
                 self.w3.to_checksum_address(spender)
             ).call()
             return allowance
+        except RateLimitedError:
+            # Ограничение RPC — не «нулевой allowance», решение остаётся за вызывающим
+            raise
         except Exception as e:
             logger.error(f"❌ Ошибка при получении allowance: {e}")
             return 0
 
     # Врап нативного токена
-    async def wrap_native(self, token_address: str, amount_wei: int = None) -> str:
+    async def wrap_native(self, amount_wei: int, fees: Optional[dict] = None) -> Optional[str]:
         """
         Оборачивает нативный токен (ETH/BNB/MATIC) в WETH/WBNB/WMATIC.
+        `fees` — поля комиссии (см. `fee_fields`), которыми заменяются рассчитанные по умолчанию.
         """
-        from utils.wrappers import wrap_native_token
-        if amount_wei is None:
-            amount_wei = self.to_wei_main(self.amount, token_address)
-
-        tx = await wrap_native_token(self.w3, self.network.name, amount_wei, self.address)
-        signed = self.w3.eth.account.sign_transaction(tx, self.private_key)
-        tx_hash = await self.w3.eth.send_raw_transaction(signed.raw_transaction)
-        logger.info(f"🚀 Отправлен wrap-тx: {tx_hash.hex()}\n")
-        return tx_hash.hex()
+        tx = await wrap_native_token(self.w3, self.network.name, amount_wei, self.address, await self.get_nonce(),
+                                     self.engine.weth_address)
+        if fees:
+            for key in FEE_FIELDS:
+                tx.pop(key, None)
+            tx.update(fees)
+        tx_hash = await self.sign_and_send_tx(tx, without_gas=True)
+        logger.info(f"🚀 Отправлен wrap-тx: {tx_hash}\n")
+        return tx_hash
 
     # Анврап нативного токена
-    async def unwrap_native(self, amount_wei: int) -> str:
+    async def unwrap_native(self, amount_wei: int) -> Optional[str]:
         """
         Разворачивает WETH/WBNB/... обратно в нативный токен.
         """
-        from utils.wrappers import unwrap_native_token
-        tx = await unwrap_native_token(self.w3, self.network.name, amount_wei, self.address)
-        signed = self.w3.eth.account.sign_transaction(tx, self.private_key)
-        tx_hash = await self.w3.eth.send_raw_transaction(signed.raw_transaction)
-        logger.info(f"🚀 Отправлен unwrap-тx: {tx_hash.hex()}\n")
-        return tx_hash.hex()
+        tx = await unwrap_native_token(self.w3, self.network.name, amount_wei, self.address, await self.get_nonce(),
+                                       self.engine.weth_address)
+        tx_hash = await self.sign_and_send_tx(tx, without_gas=True)
+        logger.info(f"🚀 Отправлен unwrap-тx: {tx_hash}\n")
+        return tx_hash
 
     # Получение баланса ERC20
     async def get_erc20_balance(self) -> float | int:
-
-        contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(self.usdc_address), abi=ERC20_ABI)
+        contract = await self.get_contract(self.usdc_address, ERC20_ABI)
         try:
             balance = await contract.functions.balanceOf(self.address).call()
             return balance
+        except RateLimitedError:
+            # Ограничение RPC — не «нулевой баланс», решение остаётся за вызывающим
+            raise
         except Exception as e:
             logger.error(f"❌ Ошибка при получении баланса ERC20: {e}")
             return 0
 
     # Создание объекта контракт для дальнейшего обращения к нему
     async def get_contract(self, contract_address: str, abi: list) -> AsyncContract:
-        return self.w3.eth.contract(
-            address=self.w3.to_checksum_address(contract_address), abi=abi
-        )
+        return self.engine.contract(contract_address, abi, self.wallet.proxy)
 
     # Получение суммы газа за транзакцию
     async def get_tx_fee(self) -> int:
@@ -166,55 +212,15 @@ class Client:
             fallback_gas_price = await self.w3.eth.gas_price
             return fallback_gas_price * 70_000
 
-    # Преобразование в веи
-    async def to_wei_main(self, number: int | float, token_address: Optional[str] = None):
-        try:
-            if token_address:
-                contract = await self.get_contract(token_address, ERC20_ABI)
-                decimals = await contract.functions.decimals().call()
-            else:
-                decimals = 18
-
-            unit_name = {
-                6: "mwei",
-                9: "gwei",
-                18: "ether"
-            }.get(decimals)
+    # Преобразование в веи (целочисленно, без float)
+    async def to_wei_main(self, number: AmountLike, token_address: Optional[str] = None) -> int:
+        decimals = await self.engine.decimals(token_address) if token_address else 18
+        return TokenAmount.parse(number, decimals).raw
 
-            if not unit_name:
-                # Для нестандартных decimals используем прямой расчет
-                return int(Decimal(str(number)) * Decimal(10 ** decimals))
-            
-            return self.w3.to_wei(number, unit_name)
-        except Exception as e:
-            logger.error(f"❌ Ошибка преобразования в wei: {e}")
-            # Возвращаем значение по умолчанию при ошибке
-            return int(float(number) * (10 ** 18))
-
-    # Преобразование из веи
-    async def from_wei_main(self, number: int | float, token_address: Optional[str] = None):
-        try:
-            if token_address:
-                contract = await self.get_contract(token_address, ERC20_ABI)
-                decimals = await contract.functions.decimals().call()
-            else:
-                decimals = 18
-
-            unit_name = {
-                6: "mwei",
-                9: "gwei",
-                18: "ether"
-            }.get(decimals)
-
-            if not unit_name:
-                # Для нестандартных decimals используем прямой расчет
-                return float(Decimal(str(number)) / Decimal(10 ** decimals))
-            
-            return self.w3.from_wei(number, unit_name)
-        except Exception as e:
-            logger.error(f"❌ Ошибка преобразования из wei: {e}")
-            # Возвращаем значение по умолчанию при ошибке
-            return float(number) / (10 ** 18)
+    # Преобразование из веи для вывода
+    async def from_wei_main(self, number: int, token_address: Optional[str] = None) -> TokenAmount:
+        decimals = await self.engine.decimals(token_address) if token_address else 18
+        return TokenAmount(number, decimals)
 
     # Метод для построения swap транзакции
     async def build_swap_tx(self, quote_data: dict) -> TxParams:
@@ -245,8 +251,8 @@ class Client:
     # Approve
     async def approve_usdc(self, usdc_contract, spender, amount, eip_1559: bool):
         owner = self.address
-        nonce = await self.w3.eth.get_transaction_count(owner)
-        chain_id = await self.w3.eth.chain_id
+        nonce = await self.get_nonce()
+        chain_id = self.chain_id
 
         tx_params = {
             'from': owner,
@@ -272,24 +278,41 @@ class Client:
         tx = await usdc_contract.functions.approve(spender, amount).build_transaction(tx_params)
 
         # Подпись и отправка
-        signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
-        tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        signed_tx = self.sign(tx)
+        try:
+            tx_hash = await self.send_signed(signed_tx)
+        except Exception:
+            # Локальный nonce мог разойтись с сетью — запросим его заново
+            self.wallet.nonce = None
+            raise
+        self.wallet.nonce = nonce + 1
         receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash)
 
         return receipt
 
+    @staticmethod
+    def fee_fields(transaction: TxParams) -> dict:
+        """Поля комиссии транзакции (EIP-1559 или legacy)"""
+        return {key: transaction[key] for key in FEE_FIELDS if key in transaction}
+
+    @staticmethod
+    def max_fee_per_gas(transaction: TxParams) -> int:
+        """Максимальная цена газа, которую может списать транзакция"""
+        return transaction.get("maxFeePerGas") or transaction["gasPrice"]
+
     # Подготовка транзакции
     async def prepare_tx(self, value: Union[int, float] = 0) -> TxParams:
         transaction: TxParams = {
-            "chainId": await self.w3.eth.chain_id,
-            "nonce": await self.w3.eth.get_transaction_count(self.address),
+            "chainId": self.chain_id,
+            "nonce": await self.get_nonce(),
             "from": self.address,
             "value": value,
         }
 
         if self.eip_1559:
-            base_fee = await self.w3.eth.gas_price
-            max_priority_fee_per_gas = await self.w3.eth.max_priority_fee or base_fee
+            base_fee = await self.per_block("gas_price", lambda: self.w3.eth.gas_price)
+            max_priority_fee_per_gas = await self.per_block(
+                "max_priority_fee", lambda: self.w3.eth.max_priority_fee) or base_fee
             max_fee_per_gas = int(base_fee * 1.25 + max_priority_fee_per_gas)
 
             transaction.update({
@@ -298,32 +321,43 @@ class Client:
                 "type": "0x2",
             })
         else:
-            transaction["gasPrice"] = int((await self.w3.eth.gas_price) * 1.25)
+            transaction["gasPrice"] = int((await self.per_block("gas_price", lambda: self.w3.eth.gas_price)) * 1.25)
 
         return transaction
 
+    # Отправка подписанной транзакции: рассылкой на все RPC или через основной провайдер
+    async def send_signed(self, signed) -> str:
+        if self.broadcaster:
+            return await self.broadcaster.send_raw_transaction(signed.raw_transaction, self.w3.to_hex(signed.hash))
+        return self.w3.to_hex(await self.w3.eth.send_raw_transaction(signed.raw_transaction))
+
     # Подпись и отправка транзакции
     async def sign_and_send_tx(self, transaction: TxParams, without_gas: bool = False):
         try:
             if not without_gas:
                 transaction["gas"] = int((await self.w3.eth.estimate_gas(transaction)) * 1.5)
 
-            signed = self.w3.eth.account.sign_transaction(transaction, self.private_key)
-            signed_raw_tx = signed.raw_transaction
+            signed = self.sign(transaction)
             logger.info("✅ Транзакция подписана\n")
 
-            tx_hash_bytes = await self.w3.eth.send_raw_transaction(signed_raw_tx)
-            tx_hash_hex = self.w3.to_hex(tx_hash_bytes)
+            tx_hash_hex = await self.send_signed(signed)
             logger.info("✅ Транзакция отправлена: %s\n", tx_hash_hex)
+            self.wallet.nonce = transaction["nonce"] + 1
 
             return tx_hash_hex
+        except RateLimitedError:
+            self.wallet.nonce = None
+            raise
         except Exception as e:
             logger.error(f"❌ Ошибка при отправке транзакции: {e}")
+            # Локальный nonce мог разойтись с сетью — запросим его заново
+            self.wallet.nonce = None
             return None
 
     # Ожидание результата транзакции
     async def wait_tx(self, tx_hash: Union[str, HexBytes], explorer_url: Optional[str] = None) -> bool:
-        total_time = 0
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
         timeout = 120
         poll_latency = 10
 
@@ -337,16 +371,21 @@ class Client:
                     logger.info(f"✅ Транзакция выполнена успешно: {explorer_url}/tx/{tx_hash_bytes.hex()}\n")
                     return True
                 elif status is None:
-                    await asyncio.sleep(poll_latency)
+                    await self.wait_next_block(poll_latency)
                 else:
                     logger.error(f"❌ Транзакция не выполнена: {explorer_url}/tx/{tx_hash_bytes.hex()}")
                     return False
             except TransactionNotFound:
-                if total_time > timeout:
+                if loop.time() - started_at > timeout:
                     logger.warning(f"❌ Транзакция {tx_hash_bytes.hex()} не подтвердилась за 120 секунд")
                     return False
-                total_time += poll_latency
-                await asyncio.sleep(poll_latency)
+                await self.wait_next_block(poll_latency)
+            except RateLimitedError as e:
+                # Транзакция уже отправлена — продолжаем ждать, пока RPC снимет ограничение
+                if loop.time() - started_at > timeout:
+                    raise
+                logger.warning(f"⏳ {e}, продолжаем ожидание receipt")
+                await self.wait_next_block(poll_latency)
             except Exception as e:
                 logger.error(f"❌ Ошибка при получении receipt: {e}")
                 return False
@@ -0,0 +1,253 @@
+from web3.middleware.geth_poa import async_geth_poa_middleware
+from eth_utils import to_checksum_address
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3.contract import AsyncContract
+from eth_account import Account
+from client.cassette import Cassette, CassetteProvider
+from client.transport import HeadsTransport
+from client.broadcaster import Broadcaster
+from client.ratelimit import RateLimitedProvider, RequestScheduler, DEFAULT_RATE, DEFAULT_BURST
+from client.networks import Network
+from typing import Dict, Optional, Tuple
+from hexbytes import HexBytes
+import asyncio
+import logging
+import json
+
+# ABI разбираются один раз на процесс; кэш контрактов движка опирается на идентичность этих объектов
+with open("abi/erc20_abi.json", "r", encoding="utf-8") as file:
+    ERC20_ABI = json.load(file)
+
+with open("abi/pool_abi.json", "r", encoding="utf-8") as file:
+    POOL_ABI = json.load(file)
+
+NETWORKS_DATA_PATH = "constants/networks_data.json"
+
+logger = logging.getLogger(__name__)
+
+
+class ChainEngine:
+    """
+    Общее для всех кошельков сети состояние: подключения AsyncWeb3 (по одному на прокси),
+    объекты контрактов, decimals токенов, поблочный кэш комиссий, WS-транспорт и рассылка.
+
+    Один движок обслуживает любое число кошельков (`WalletContext`), поэтому
+    создание клиента для кошелька не открывает новых соединений и не парсит ABI.
+    """
+
+    def __init__(self, network: Network, rpc_url: str, pool_address: str, usdc_address: str,
+                 explorer_url: str = "", ws_url: Optional[str] = None,
+                 broadcast_urls: Optional[list[str]] = None, cassette: Optional[Cassette] = None,
+                 usdc_decimals: Optional[int] = None, weth_address: Optional[str] = None,
+                 max_concurrency: int = 16, rate_limits: Optional[Dict[str, dict]] = None):
+        self.network = network
+        self.chain_id = network.chain_id
+        self.rpc_url = rpc_url
+        self.pool_address = pool_address
+        self.usdc_address = usdc_address
+        self.explorer_url = explorer_url
+        self.ws_url = ws_url
+        self.broadcast_urls = broadcast_urls
+        self.cassette = cassette
+        self.weth_address = weth_address
+        # Лимиты запросов по эндпоинтам: {url: {"rate": запросов в секунду, "burst": запас}}
+        self.rate_limits = rate_limits or {}
+        self.eip_1559 = True
+        self.transport: Optional[HeadsTransport] = None
+        # Свой лимит параллельных задач у каждой сети: медленная сеть не тормозит быстрые
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+        self._w3: Dict[Optional[str], AsyncWeb3] = {}
+        self._broadcasters: Dict[Optional[str], Broadcaster] = {}
+        self._contracts: Dict[Tuple[str, int, int], AsyncContract] = {}
+        self._decimals: Dict[str, int] = {}
+        if usdc_decimals is not None:
+            self._decimals[usdc_address] = usdc_decimals
+
+    @classmethod
+    def from_network_data(cls, network_data: dict, settings: dict, cassette: Optional[Cassette] = None) -> "ChainEngine":
+        """Создаёт движок по записи из constants/networks_data.json и settings.json"""
+        chain_id = network_data["chain_id"]
+        if isinstance(chain_id, str):
+            network = Network.from_name(chain_id)
+        else:
+            network = Network.from_chain_id(chain_id)
+
+        return cls(
+            network,
+            rpc_url=network_data["rpc_url"],
+            pool_address=to_checksum_address(network_data["pool_address"]),
+            usdc_address=to_checksum_address(network_data["usdc_address"]),
+            explorer_url=network_data["explorer_url"],
+            ws_url=network_data.get("ws_url"),
+            broadcast_urls=network_data.get("broadcast_rpc_urls") if settings.get("broadcast") else None,
+            cassette=cassette,
+            usdc_decimals=network_data.get("decimals"),
+            weth_address=to_checksum_address(network_data["weth_address"]) if network_data.get("weth_address") else None,
+            max_concurrency=network_data.get("max_concurrency", 16),
+            rate_limits=network_data.get("rate_limits")
+        )
+
+    # Планировщик запросов к эндпоинту через прокси (общий для всех сетей и кошельков)
+    def scheduler_for(self, endpoint: str, proxy: Optional[str] = None) -> RequestScheduler:
+        limits = self.rate_limits.get(endpoint, {})
+        return RequestScheduler.get(endpoint, proxy, limits.get("rate", DEFAULT_RATE), limits.get("burst", DEFAULT_BURST))
+
+    # HTTP-подключение для прокси (одно на прокси, общее для всех его кошельков)
+    def w3_for(self, proxy: Optional[str] = None) -> AsyncWeb3:
+        if proxy not in self._w3:
+            request_kwargs = {"proxy": f"http://{proxy}"} if proxy else {}
+            provider = AsyncHTTPProvider(self.rpc_url, request_kwargs=request_kwargs)
+            # Лимит запросов и повтор ответов 429
+            provider = RateLimitedProvider(provider, self.scheduler_for(self.rpc_url, proxy))
+            # Запись или воспроизведение всех JSON-RPC запросов
+            if self.cassette:
+                provider = CassetteProvider(provider, self.cassette)
+            w3 = AsyncWeb3(provider)
+            # Применяем middleware для PoA-сетей
+            if self.network.is_poa:
+                w3.middleware_onion.clear()
+                w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+            self._w3[proxy] = w3
+        return self._w3[proxy]
+
+    # Подключение для запросов кошелька
+    def w3(self, proxy: Optional[str] = None) -> AsyncWeb3:
+        # Кошельки с прокси ходят только через свой HTTP, чтобы не светить общий IP сокета
+        if self.transport and not proxy:
+            return self.transport.w3
+        return self.w3_for(proxy)
+
+    # Рассылка подписанных транзакций сразу на все RPC, если заданы дополнительные эндпоинты.
+    # Рассылка идёт мимо провайдера, поэтому с кассетой она отключается
+    def broadcaster_for(self, proxy: Optional[str] = None) -> Optional[Broadcaster]:
+        if not self.broadcast_urls or self.cassette:
+            return None
+        if proxy not in self._broadcasters:
+            rpc_urls = [self.rpc_url, *self.broadcast_urls]
+            schedulers = {rpc_url: self.scheduler_for(rpc_url, proxy) for rpc_url in rpc_urls}
+            self._broadcasters[proxy] = Broadcaster(rpc_urls, proxy, schedulers=schedulers)
+        return self._broadcasters[proxy]
+
+    @property
+    def broadcasters(self) -> list[Broadcaster]:
+        return list(self._broadcasters.values())
+
+    # Закрытие сессий рассылки (после досылки фоновых отправок)
+    async def close(self) -> None:
+        for broadcaster in self.broadcasters:
+            await broadcaster.close()
+
+    # Объект контракта (кэшируется, чтобы не разбирать ABI повторно)
+    def contract(self, address: str, abi: list, proxy: Optional[str] = None) -> AsyncContract:
+        w3 = self.w3(proxy)
+        # Контракт привязан к подключению, поэтому при переключении WS/HTTP создаётся заново
+        key = (address.lower(), id(abi), id(w3))
+        if key not in self._contracts:
+            self._contracts[key] = w3.eth.contract(address=w3.to_checksum_address(address), abi=abi)
+        return self._contracts[key]
+
+    # Decimals токена (запрашиваются один раз)
+    async def decimals(self, token_address: str) -> int:
+        token_address = to_checksum_address(token_address)
+        if token_address not in self._decimals:
+            self._decimals[token_address] = await self.contract(token_address, ERC20_ABI).functions.decimals().call()
+        return self._decimals[token_address]
+
+    # Подключение к общему WebSocket-транспорту эндпоинта
+    async def connect_ws(self) -> None:
+        # WS-трафик не попадает в кассету, поэтому при записи и воспроизведении работаем по HTTP
+        if self.cassette:
+            logger.info("📼 Кассета включена — WebSocket не используется")
+            return
+        self.transport = HeadsTransport.get(self.ws_url, self.w3_for(None), self.network.is_poa)
+        await self.transport.start()
+
+    # Значение, актуальное в пределах текущего блока
+    async def per_block(self, key: str, factory):
+        if self.transport:
+            return await self.transport.cached(key, factory)
+        return await factory()
+
+    # Ожидание следующего блока (или паузы, если транспорт не подключён)
+    async def wait_next_block(self, timeout: float) -> None:
+        if self.transport:
+            await self.transport.wait_for_block(timeout)
+        else:
+            await asyncio.sleep(timeout)
+
+
+class ChainRegistry:
+    """
+    Движки всех сетей из constants/networks_data.json.
+
+    Движок сети создаётся при первом обращении, поэтому задачи для разных сетей
+    выполняются в одном процессе, а новая сеть подключается только записью в JSON.
+    Используется как асинхронный контекстный менеджер: на выходе закрываются
+    рассылка, WS-транспорты, планировщики запросов и кассета.
+    """
+
+    def __init__(self, networks_data: dict, settings: dict, cassette: Optional[Cassette] = None):
+        self.networks_data = networks_data
+        self.settings = settings
+        self.cassette = cassette
+        self.engines: Dict[str, ChainEngine] = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: dict, networks_path: str = NETWORKS_DATA_PATH) -> "ChainRegistry":
+        """Реестр по networks_data.json и settings.json (с кассетой, если она задана)"""
+        with open(networks_path, "r", encoding="utf-8") as file:
+            networks_data = json.load(file)
+        return cls(networks_data, settings, Cassette.from_settings(settings))
+
+    async def __aenter__(self) -> "ChainRegistry":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.networks_data)
+
+    # Движок сети по её имени из networks_data.json
+    async def get(self, name: str) -> ChainEngine:
+        name = name.upper()
+        if name in self.engines:
+            return self.engines[name]
+        if name not in self.networks_data:
+            raise ValueError(f"Сеть {name} не описана в networks_data.json. Доступные сети: {self.names}")
+
+        async with self._lock:
+            if name not in self.engines:
+                engine = ChainEngine.from_network_data(self.networks_data[name], self.settings, self.cassette)
+                if self.settings.get("websocket"):
+                    await engine.connect_ws()
+                self.engines[name] = engine
+        return self.engines[name]
+
+    # Закрытие рассылки всех сетей, WS-транспортов, планировщиков запросов и кассеты
+    async def close(self) -> None:
+        for engine in self.engines.values():
+            await engine.close()
+        await HeadsTransport.close_all()
+        RequestScheduler.close_all()
+        if self.cassette:
+            self.cassette.close()
+
+
+class WalletContext:
+    """
+    Компактное состояние кошелька: адрес, ключ, локальный nonce и прокси.
+
+    Объект `Account` не хранится — ключ используется только при подписи.
+    """
+
+    __slots__ = ("address", "key", "nonce", "proxy")
+
+    def __init__(self, private_key: str | bytes, proxy: Optional[str] = None, address: Optional[str] = None):
+        self.key = bytes(HexBytes(private_key))
+        self.address = address or Account.from_key(self.key).address
+        self.nonce: Optional[int] = None
+        self.proxy = proxy or None
@@ -0,0 +1,232 @@
+from web3.providers.async_base import AsyncBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+from email.utils import parsedate_to_datetime
+from aiohttp import ClientResponseError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import itertools
+import asyncio
+import logging
+import random
+import heapq
+import time
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов: меньше — раньше
+PRIORITY_SEND = 0
+PRIORITY_READ = 1
+SEND_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+
+DEFAULT_RATE = 10
+DEFAULT_BURST = 20
+MAX_RETRIES = 5
+INITIAL_BACKOFF = 1
+MAX_BACKOFF = 30
+JITTER = 0.25
+
+# Коды и тексты ошибок JSON-RPC, которыми публичные ноды сообщают о превышении лимита
+THROTTLE_ERROR_CODES = (429, -32005, -32090)
+THROTTLE_ERROR_MARKERS = ("rate limit", "too many request", "exceeded the quota", "request limit")
+
+
+class RateLimitedError(Exception):
+    """Эндпоинт ограничивает запросы и не ответил после всех повторов"""
+
+    def __init__(self, endpoint: str, retry_after: Optional[float] = None):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        message = f"RPC {endpoint} ограничивает запросы"
+        if retry_after:
+            message += f", повтор через {retry_after:.1f} с"
+        super().__init__(message)
+
+
+# Разбор заголовка Retry-After: число секунд или HTTP-дата
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Признак ограничения в теле ответа JSON-RPC (некоторые ноды отвечают 200 с ошибкой)
+def is_throttled_response(response: dict) -> bool:
+    error = response.get("error") if isinstance(response, dict) else None
+    if not isinstance(error, dict):
+        return False
+    if error.get("code") in THROTTLE_ERROR_CODES:
+        return True
+    message = str(error.get("message", "")).lower()
+    return any(marker in message for marker in THROTTLE_ERROR_MARKERS)
+
+
+# Middleware для провайдеров без RateLimitedProvider (WebSocket): ответ об ограничении
+# превращается в RateLimitedError, а не в общую ошибку, которую вызывающий примет за ноль
+async def throttling_middleware(make_request: Callable, w3: Any) -> Callable:
+    endpoint = getattr(w3.provider, "endpoint_uri", None) or str(w3.provider)
+
+    async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+        response = await make_request(method, params)
+        if is_throttled_response(response):
+            raise RateLimitedError(str(endpoint))
+        return response
+
+    return middleware
+
+
+class RequestScheduler:
+    """
+    Планировщик запросов к одному эндпоинту через один прокси.
+
+    Запросы получают токены из корзины (`rate` в секунду, запас `burst`) в порядке
+    приоритета: отправка транзакций идёт раньше чтений. После ответа 429 корзина
+    замораживается на Retry-After, а скорость уменьшается вдвое и затем плавно
+    возвращается к `rate`, чтобы держаться у максимальной устойчивой пропускной способности.
+    На каждую пару (эндпоинт, прокси) создаётся один планировщик (см. `get`); реестр
+    очищается при закрытии `ChainRegistry` (см. `close_all`).
+    """
+
+    _instances: Dict[Tuple[str, Optional[str]], "RequestScheduler"] = {}
+
+    def __init__(self, endpoint: str, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.endpoint = endpoint
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.throttled = 0
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def get(cls, endpoint: str, proxy: Optional[str] = None, rate: float = DEFAULT_RATE,
+            burst: int = DEFAULT_BURST) -> "RequestScheduler":
+        """Возвращает общий планировщик для эндпоинта и прокси, создавая его при первом обращении"""
+        key = (endpoint, proxy)
+        if key not in cls._instances:
+            cls._instances[key] = cls(endpoint, rate, burst)
+        return cls._instances[key]
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Отменяет таймеры и ожидающих всех планировщиков и очищает реестр"""
+        for scheduler in cls._instances.values():
+            scheduler._reset()
+        cls._instances.clear()
+
+    def _reset(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters = []
+        self._loop = None
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    # Выдача токенов ожидающим в порядке приоритета
+    def _dispatch(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+
+        delay = None
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                # Ожидающий отменён
+                heapq.heappop(self._waiters)
+                continue
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+                break
+            if self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                break
+            self.tokens -= 1
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+        if delay is not None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    # Ожидание разрешения на запрос
+    async def acquire(self, priority: int = PRIORITY_READ) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Предыдущий цикл событий завершился: его таймер и ожидающие уже не сработают
+            self._reset()
+            self._loop = loop
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._timer is None:
+            self._dispatch()
+        await future
+
+    # Эндпоинт ответил 429: пауза для всех запросов и снижение скорости
+    def throttle(self, retry_after: float) -> None:
+        self.throttled += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        self.tokens = 0
+        self.rate = max(self.max_rate / 10, self.rate / 2)
+        logger.warning(f"⏳ {self.endpoint} ограничивает запросы, пауза {retry_after:.1f} с, "
+                       f"скорость {self.rate:.1f} запр/с")
+
+    # Успешный ответ: скорость постепенно возвращается к настроенной
+    def release(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+
+class RateLimitedProvider(AsyncBaseProvider):
+    """
+    Обёртка над HTTP-провайдером: пропускает запросы через `RequestScheduler`
+    и повторяет ответы 429 с экспоненциальной задержкой со случайным разбросом.
+    """
+
+    def __init__(self, provider: AsyncBaseProvider, scheduler: RequestScheduler, max_retries: int = MAX_RETRIES):
+        super().__init__()
+        self.provider = provider
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        priority = PRIORITY_SEND if method in SEND_METHODS else PRIORITY_READ
+        backoff = INITIAL_BACKOFF
+        retry_after = None
+
+        for _ in range(self.max_retries + 1):
+            await self.scheduler.acquire(priority)
+            try:
+                response = await self.provider.make_request(method, params)
+            except ClientResponseError as e:
+                if e.status != 429:
+                    raise
+                retry_after = parse_retry_after(e.headers.get("Retry-After") if e.headers else None)
+            else:
+                if not is_throttled_response(response):
+                    self.scheduler.release()
+                    return response
+                retry_after = None
+
+            delay = (retry_after if retry_after is not None else backoff) * random.uniform(1, 1 + JITTER)
+            self.scheduler.throttle(delay)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+        raise RateLimitedError(self.scheduler.endpoint, retry_after)
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return await self.provider.is_connected(show_traceback)
@@ -0,0 +1,275 @@
+from web3.middleware.geth_poa import async_geth_poa_middleware
+from web3.providers.async_base import AsyncJSONBaseProvider
+from websockets.exceptions import ConnectionClosed
+from websockets.asyncio.client import ClientConnection, connect
+from web3.types import RPCEndpoint, RPCResponse
+from client.ratelimit import throttling_middleware
+from typing import Any, Awaitable, Callable, Dict, Optional
+from web3 import AsyncWeb3
+import asyncio
+import logging
+import json
+
+logger = logging.getLogger(__name__)
+
+INITIAL_BACKOFF = 1
+MAX_BACKOFF = 60
+HTTP_POLL_INTERVAL = 3
+REQUEST_TIMEOUT = 50
+# Без нового блока дольше этого времени соединение считается мёртвым
+HEAD_TIMEOUT = 60
+
+
+class WebsocketRPCProvider(AsyncJSONBaseProvider):
+    """
+    JSON-RPC поверх одного WebSocket-соединения.
+
+    Сокет читает одна задача: она ждёт сообщения в `recv()`, отдаёт ответы запросам
+    по id, а уведомления подписок складывает в очередь. Когда сокет закрывается,
+    ожидающие запросы и `next_notification` получают ConnectionError.
+    """
+
+    def __init__(self, endpoint_uri: str, request_timeout: float = REQUEST_TIMEOUT):
+        super().__init__()
+        self.endpoint_uri = endpoint_uri
+        self.request_timeout = request_timeout
+        self._ws: Optional[ClientConnection] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._notifications: asyncio.Queue = asyncio.Queue()
+        self._error: Optional[ConnectionError] = None
+
+    def __str__(self) -> str:
+        return f"WebSocket {self.endpoint_uri}"
+
+    async def connect(self) -> None:
+        self._ws = await connect(self.endpoint_uri)
+        self._reader = asyncio.create_task(self._read())
+
+    async def disconnect(self) -> None:
+        if self._ws:
+            await self._ws.close()
+        if self._reader:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return self._ws is not None and self._error is None
+
+    async def _read(self) -> None:
+        error = ConnectionError(f"WebSocket {self.endpoint_uri} закрыт")
+        try:
+            async for message in self._ws:
+                response = json.loads(message)
+                if response.get("method") == "eth_subscription":
+                    self._notifications.put_nowait(response["params"])
+                    continue
+                future = self._pending.pop(response.get("id"), None)
+                if future and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            error = ConnectionError(f"WebSocket {self.endpoint_uri} оборван: {e}")
+        finally:
+            self._fail(error)
+
+    # Соединение потеряно: будим всех, кто ждёт ответа или уведомления
+    def _fail(self, error: ConnectionError) -> None:
+        self._error = error
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+        self._notifications.put_nowait(error)
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self._ws is None or self._error:
+            raise self._error or ConnectionError(f"WebSocket {self.endpoint_uri} не подключён")
+
+        request = self.encode_rpc_request(method, params)
+        request_id = json.loads(request)["id"]
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._ws.send(request.decode())
+            return await asyncio.wait_for(future, self.request_timeout)
+        except ConnectionClosed as e:
+            raise ConnectionError(f"WebSocket {self.endpoint_uri} оборван: {e}") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    # Следующее уведомление подписки или None, если за `timeout` ничего не пришло.
+    # asyncio.wait, а не wait_for: тот в 3.11 теряет отмену, если уведомление пришло одновременно с ней
+    async def next_notification(self, timeout: float) -> Optional[dict]:
+        getter = asyncio.ensure_future(self._notifications.get())
+        try:
+            done, _ = await asyncio.wait({getter}, timeout=timeout)
+        finally:
+            getter.cancel()
+        if not done:
+            return None
+
+        notification = getter.result()
+        if isinstance(notification, Exception):
+            # Ошибка остаётся в очереди для следующих читателей
+            self._notifications.put_nowait(notification)
+            raise notification
+        return notification
+
+
+class HeadsTransport:
+    """
+    Общее для всех кошельков подключение к эндпоинту с подпиской на newHeads.
+
+    На каждый ws_url создаётся один сокет (см. `get`), через который идут запросы
+    всех клиентов. Каждый новый блок будит ожидающих (`wait_for_block`), вызывает
+    подписчиков и сбрасывает поблочный кэш. При обрыве (или если блоков нет дольше
+    HEAD_TIMEOUT) соединение восстанавливается с экспоненциальной задержкой, а пока
+    WS недоступен, блоки опрашиваются по HTTP.
+    """
+
+    _instances: Dict[str, "HeadsTransport"] = {}
+
+    def __init__(self, ws_url: Optional[str], http_w3: AsyncWeb3, is_poa: bool = False):
+        self.ws_url = ws_url
+        self.http_w3 = http_w3
+        self.is_poa = is_poa
+        self.ws_w3: Optional[AsyncWeb3] = None
+        self.connected = False
+        self.block_number: Optional[int] = None
+        self.base_fee: Optional[int] = None
+        self.cache: Dict[str, Any] = {}
+        self.subscribers: list[Callable[[dict], Optional[Awaitable[None]]]] = []
+        self._new_block = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def get(cls, ws_url: Optional[str], http_w3: AsyncWeb3, is_poa: bool = False) -> "HeadsTransport":
+        """Возвращает общий транспорт для эндпоинта, создавая его при первом обращении"""
+        key = ws_url or f"http:{id(http_w3)}"
+        if key not in cls._instances:
+            cls._instances[key] = cls(ws_url, http_w3, is_poa)
+        return cls._instances[key]
+
+    @classmethod
+    async def close_all(cls) -> None:
+        for transport in list(cls._instances.values()):
+            await transport.close()
+        cls._instances.clear()
+
+    @property
+    def w3(self) -> AsyncWeb3:
+        """WS-подключение, если оно активно, иначе HTTP"""
+        return self.ws_w3 if self.connected and self.ws_w3 else self.http_w3
+
+    # Запуск фонового цикла получения блоков
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._disconnect()
+
+    def subscribe(self, callback: Callable[[dict], Optional[Awaitable[None]]]) -> None:
+        self.subscribers.append(callback)
+
+    # Ожидание следующего блока
+    async def wait_for_block(self, timeout: Optional[float] = None) -> bool:
+        try:
+            await asyncio.wait_for(self._new_block.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # Значение, кэшируемое до следующего блока
+    async def cached(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        if key not in self.cache:
+            self.cache[key] = await factory()
+        return self.cache[key]
+
+    async def _on_head(self, head: dict) -> None:
+        number = head.get("number")
+        if isinstance(number, str):
+            number = int(number, 16)
+        if self.block_number is not None and number is not None and number <= self.block_number:
+            return
+
+        base_fee = head.get("baseFeePerGas")
+        self.block_number = number
+        self.base_fee = int(base_fee, 16) if isinstance(base_fee, str) else base_fee
+        self.cache.clear()
+
+        # Будим всех ожидающих и сразу взводим событие заново для следующего блока
+        self._new_block.set()
+        self._new_block = asyncio.Event()
+
+        for callback in self.subscribers:
+            try:
+                result = callback(head)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"❌ Ошибка обработчика нового блока: {e}")
+
+    async def _disconnect(self) -> None:
+        self.connected = False
+        if self.ws_w3:
+            try:
+                await self.ws_w3.provider.disconnect()
+            except Exception:
+                pass
+            self.ws_w3 = None
+
+    async def _listen_ws(self) -> None:
+        provider = WebsocketRPCProvider(self.ws_url)
+        self.ws_w3 = AsyncWeb3(provider)
+        # Запросы по сокету идут мимо RateLimitedProvider — ограничение распознаётся здесь
+        self.ws_w3.middleware_onion.add(throttling_middleware, name="throttling")
+        if self.is_poa:
+            self.ws_w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+        await provider.connect()
+
+        subscription = await self.ws_w3.manager.coro_request(RPCEndpoint("eth_subscribe"), ["newHeads"])
+        self.connected = True
+        logger.info(f"🔌 WebSocket подключён: {self.ws_url}")
+
+        while True:
+            notification = await provider.next_notification(HEAD_TIMEOUT)
+            if notification is None:
+                raise ConnectionError(f"нет новых блоков {HEAD_TIMEOUT} с")
+            if notification.get("subscription") == subscription:
+                await self._on_head(notification["result"])
+
+    # Опрос новых блоков по HTTP, пока WS недоступен
+    async def _poll_http(self, duration: Optional[float]) -> None:
+        elapsed = 0
+        while duration is None or elapsed < duration:
+            try:
+                await self._on_head(dict(await self.http_w3.eth.get_block("latest")))
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка опроса блока по HTTP: {e}")
+            await asyncio.sleep(HTTP_POLL_INTERVAL)
+            elapsed += HTTP_POLL_INTERVAL
+
+    async def _run(self) -> None:
+        if not self.ws_url:
+            await self._poll_http(None)
+            return
+
+        backoff = INITIAL_BACKOFF
+        while True:
+            try:
+                await self._listen_ws()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ WebSocket {self.ws_url} недоступен ({e}), HTTP на {backoff} с")
+            # Если соединение успело установиться, считаем это новым обрывом, а не серией неудач
+            if self.connected:
+                backoff = INITIAL_BACKOFF
+            await self._disconnect()
+            await self._poll_http(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
@@ -1,14 +1,19 @@
-from decimal import Decimal, InvalidOperation
 from eth_utils import decode_hex
 from dotenv import load_dotenv
 from eth_keys import keys
+from client.networks import Network
+from client.cassette import REPLAY
+from utils.amount import TokenAmount
 import requests
 import logging
 import json
 import os
 import re
 
-MIN_AMOUNT = Decimal(0.00001)
+MIN_AMOUNT = TokenAmount.parse("0.00001", 18)
+# Максимальная точность суммы в конфиге; точность конкретного токена проверяется при конвертации
+MAX_AMOUNT_DECIMALS = 18
+NETWORKS_DATA_PATH = "constants/networks_data.json"
 logger = logging.getLogger(__name__)
 load_dotenv(dotenv_path=".env")
 
@@ -30,20 +35,31 @@ class ConfigValidator:
             logging.error(f"Ошибка разбора JSON в файле конфигурации {self.config_path}.")
             exit(1)
 
+    @staticmethod
+    def load_env_json(name: str) -> dict:
+        """Читает JSON-объект из переменной окружения (PRIVATE_KEYS, PROXIES)"""
+        raw = os.getenv(name)
+        if not raw:
+            logging.error(f"Ошибка: переменная окружения '{name}' не найдена.")
+            exit(1)
+
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            logging.error(f"Ошибка: '{name}' в .env имеет некорректный JSON формат.")
+            exit(1)
+
+        if not isinstance(data, dict):
+            logging.error(f"Ошибка: '{name}' в .env должна быть JSON-объектом.")
+            exit(1)
+        return data
+
     @staticmethod
     async def resolve_proxy(proxy: str) -> str:
 
         if proxy.startswith("ENV:"):
             proxy_name = proxy[4:]
-            raw = os.getenv("PROXIES")
-            if not raw:
-                logging.error("Ошибка: переменная окружения 'PROXIES' не найдена.")
-                exit(1)
-            try:
-                proxy_map = json.loads(raw)
-            except json.JSONDecodeError:
-                logging.error("Ошибка: 'PROXIES' в .env имеет некорректный JSON формат.")
-                exit(1)
+            proxy_map = ConfigValidator.load_env_json("PROXIES")
 
             if proxy_name not in proxy_map:
                 logging.error(f"Ошибка: ключ '{proxy_name}' не найден в PROXIES.")
@@ -58,16 +74,7 @@ class ConfigValidator:
 
         if key.startswith("ENV:"):
             key_name = key[4:]
-            raw = os.getenv("PRIVATE_KEYS")
-            if not raw:
-                logging.error("Ошибка: переменная окружения 'PRIVATE_KEYS' не найдена.")
-                exit(1)
-
-            try:
-                key_map = json.loads(raw)
-            except json.JSONDecodeError:
-                logging.error("Ошибка: 'PRIVATE_KEYS' в .env имеет некорректный JSON формат.")
-                exit(1)
+            key_map = ConfigValidator.load_env_json("PRIVATE_KEYS")
 
             if key_name not in key_map:
                 logging.error(f"Ошибка: ключ '{key_name}' не найден в переменной PRIVATE_KEYS.")
@@ -77,6 +84,16 @@ class ConfigValidator:
 
         return key
 
+    @staticmethod
+    async def resolve_all_private_keys() -> dict:
+        """Загружает и валидирует все приватные ключи из переменной PRIVATE_KEYS"""
+        key_map = ConfigValidator.load_env_json("PRIVATE_KEYS")
+
+        for key in key_map.values():
+            await ConfigValidator.validate_private_key(key)
+
+        return key_map
+
     async def validate_config(self) -> dict:
         """Валидация всех полей конфигурации"""
 
@@ -115,7 +132,11 @@ class ConfigValidator:
         await self.validate_token(self.config_data["token"])
         await self.validate_network(self.config_data["network"])
         await self.validate_amount(self.config_data["amount"])
-        await self.validate_proxy(self.config_data["proxy"])
+        for amount in self.config_data.get("wallet_amounts", {}).values():
+            await self.validate_amount(amount)
+        # При воспроизведении кассеты запуск полностью офлайн — прокси не проверяется
+        if (self.config_data.get("cassette") or {}).get("mode") != REPLAY:
+            await self.validate_proxy(self.config_data["proxy"])
 
         return self.config_data
 
@@ -146,21 +167,22 @@ class ConfigValidator:
     @staticmethod
     async def validate_network(network: str) -> None:
         """Валидация названия сети"""
-        networks = [
-            "LINEA"
-        ]
-        if network not in networks:
-            logging.error("Ошибка: Неподдерживаемая сеть! Введите одну из поддерживаемых сетей.")
+        with open(NETWORKS_DATA_PATH, "r", encoding="utf-8") as file:
+            networks = json.load(file)
+
+        if network not in networks or network not in Network.__members__:
+            logging.error(f"Ошибка: Неподдерживаемая сеть! Введите одну из поддерживаемых сетей: {list(networks)}.")
             exit(1)
 
     @staticmethod
     async def validate_token(token: str) -> None:
         """Валидация названия исходного токена"""
         tokens = [
-            "USDC"
+            "USDC",
+            "ETH"
         ]
         if token not in tokens:
-            logging.error("Ошибка: Неподдерживаемый токен! Введите USDC.")
+            logging.error("Ошибка: Неподдерживаемый токен! Введите USDC или ETH.")
             exit(1)
 
     @staticmethod
@@ -185,18 +207,18 @@ class ConfigValidator:
             exit(1)
 
     @staticmethod
-    async def validate_amount(amount_raw: float) -> None:
+    async def validate_amount(amount_raw: str | int | float) -> None:
         """Валидация количества токенов"""
         if not isinstance(amount_raw, (str, int, float)):
             raise ValueError(f"Количество должно быть строкой или числом, но имеет тип {type(amount_raw)}.")
 
         try:
-            amount = Decimal(str(amount_raw))
-        except InvalidOperation:
+            amount = TokenAmount.parse(amount_raw, MAX_AMOUNT_DECIMALS)
+        except ValueError:
             logging.error("Ошибка количества токенов! Введено невалидное значение.")
             exit(1)
 
-        if amount <= 0:
+        if amount.raw == 0:
             logging.error("Количество токенов должно быть больше нуля.")
             exit(1)
 
@@ -0,0 +1,42 @@
+from config.configvalidator import ConfigValidator
+from client.engine import ChainRegistry
+from utils.daemon import DepositDaemon
+from utils.logger import logger
+import argparse
+import asyncio
+import traceback
+
+
+async def main(socket_path: str, jobs_path: str, from_start: bool):
+    try:
+        logger.info("🚀 Запуск демона депозитов...\n")
+        validator = ConfigValidator("config/settings.json")
+        settings = await validator.validate_config()
+        private_keys = await ConfigValidator.resolve_all_private_keys()
+
+        async with ChainRegistry.from_settings(settings) as registry:
+            daemon = DepositDaemon(registry, private_keys, settings["network"], settings["proxy"],
+                                   default_token=settings["token"])
+            # Прогреваем подключение и кэши сети по умолчанию до первой задачи
+            engine = await registry.get(settings["network"])
+            await engine.decimals(engine.usdc_address)
+
+            sources = []
+            if socket_path:
+                sources.append(daemon.serve_socket(socket_path))
+            if jobs_path:
+                sources.append(daemon.tail_jsonl(jobs_path, from_start))
+            await asyncio.gather(*sources)
+
+    except Exception as e:
+        logger.error(f"Произошла ошибка в демоне: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Демон депозитов в ZeroLend")
+    parser.add_argument("--socket", default="data/daemon.sock", help="Путь к Unix-сокету (пусто — не слушать)")
+    parser.add_argument("--jobs", default="", help="JSONL-файл с задачами, который дописывается во время работы")
+    parser.add_argument("--from-start", action="store_true", help="Обработать задачи, уже записанные в JSONL-файл")
+    args = parser.parse_args()
+    asyncio.run(main(args.socket, args.jobs, args.from_start))
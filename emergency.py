@@ -0,0 +1,50 @@
+from config.configvalidator import ConfigValidator
+from utils.vault import EmergencyVault
+from client.engine import ChainRegistry, WalletContext
+from client.client import Client
+from utils.logger import logger
+import argparse
+import asyncio
+import os
+import traceback
+
+
+async def main(command: str, interval: int):
+    try:
+        validator = ConfigValidator("config/settings.json")
+        settings = await validator.validate_config()
+        private_keys = await ConfigValidator.resolve_all_private_keys()
+
+        async with ChainRegistry.from_settings(settings) as registry:
+            engine = await registry.get(settings["network"])
+            clients = [Client(engine, WalletContext(private_key, settings["proxy"])) for private_key in private_keys.values()]
+
+            vault = EmergencyVault(clients, engine.usdc_address, os.getenv("VAULT_PASSWORD"))
+
+            if command == "build":
+                logger.info(f"⚙️ Подписываем withdraw для {len(clients)} кошельков...\n")
+                await vault.refresh(force=True)
+                return
+
+            vault.load()
+
+            if command == "watch":
+                logger.info(f"👀 Отслеживаем актуальность хранилища каждые {interval} с...\n")
+                await vault.watch(interval)
+            elif command == "broadcast":
+                logger.warning(f"🚨 Экстренный вывод: отправляем {len(vault.entries)} транзакций\n")
+                tx_hashes = await vault.broadcast()
+                sent = [tx_hash for tx_hash in tx_hashes.values() if tx_hash]
+                logger.info(f"🎉 Отправлено {len(sent)}/{len(tx_hashes)} транзакций")
+
+    except Exception as e:
+        logger.error(f"Произошла ошибка в экстренном режиме: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Экстренный вывод средств из ZeroLend")
+    parser.add_argument("command", choices=["build", "watch", "broadcast"])
+    parser.add_argument("--interval", type=int, default=60, help="Интервал проверки хранилища в секундах")
+    args = parser.parse_args()
+    asyncio.run(main(args.command, args.interval))
@@ -0,0 +1,61 @@
+from config.configvalidator import ConfigValidator
+from utils.monitor import PositionMonitor, Position, BASE_CURRENCY_DECIMALS, HEALTH_FACTOR_DECIMALS, MULTICALL3_ADDRESS
+from client.engine import ChainRegistry, WalletContext
+from utils.amount import TokenAmount
+from utils.logger import logger
+import asyncio
+import traceback
+
+DEFAULT_MONITOR_SETTINGS = {
+    "batch_size": 200,
+    "max_calls_per_block": 2,
+    "relative_threshold": 0.001,
+    "health_factor_threshold": 0.01,
+    "history": 256
+}
+
+
+async def main():
+    try:
+        logger.info("🚀 Запуск мониторинга позиций...\n")
+        validator = ConfigValidator("config/settings.json")
+        settings = await validator.validate_config()
+        private_keys = await ConfigValidator.resolve_all_private_keys()
+        monitor_settings = {**DEFAULT_MONITOR_SETTINGS, **settings.get("monitor", {})}
+
+        async with ChainRegistry.from_settings(settings) as registry:
+            engine = await registry.get(settings["network"])
+            # Опрос привязан к новым блокам: транспорт нужен даже без WS (тогда головы читаются по HTTP)
+            await engine.connect_ws()
+            network = registry.networks_data[settings["network"]]
+
+            addresses = [WalletContext(private_key).address for private_key in private_keys.values()]
+            decimals = await engine.decimals(engine.usdc_address)
+
+            monitor = PositionMonitor(
+                engine,
+                addresses,
+                multicall_address=network.get("multicall_address", MULTICALL3_ADDRESS),
+                batch_size=monitor_settings["batch_size"],
+                max_calls_per_block=monitor_settings["max_calls_per_block"],
+                relative_threshold=monitor_settings["relative_threshold"],
+                health_factor_threshold=monitor_settings["health_factor_threshold"],
+                history=monitor_settings["history"]
+            )
+
+            def report(address: str, position: Position) -> None:
+                collateral = TokenAmount(position.collateral, BASE_CURRENCY_DECIMALS)
+                debt = TokenAmount(position.debt, BASE_CURRENCY_DECIMALS)
+                atoken_balance = TokenAmount(position.atoken_balance, decimals)
+                logger.info(f"📊 {address} блок {position.block}: залог {collateral:.2f}$, долг {debt:.2f}$, "
+                            f"HF {position.health_factor / HEALTH_FACTOR_DECIMALS:.4f}, aUSDC {atoken_balance:.6f}")
+
+            await monitor.run(report)
+
+    except Exception as e:
+        logger.error(f"Произошла ошибка в мониторинге: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
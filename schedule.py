@@ -0,0 +1,69 @@
+from config.configvalidator import ConfigValidator
+from utils.fee_scheduler import FeeScheduler
+from utils.deposit import deposit, deposit_native
+from client.engine import ChainRegistry, WalletContext
+from client.client import Client
+from utils.amount import TokenAmount
+from utils.logger import logger
+import asyncio
+import traceback
+
+DEFAULT_SCHEDULER_SETTINGS = {
+    "max_base_fee_gwei": None,
+    "percentile": 30,
+    "window": 20,
+    "rate": 1,
+    "deadline_minutes": 60,
+    "poll_interval": 12
+}
+
+
+async def main():
+    try:
+        logger.info("🚀 Запуск планировщика депозитов...\n")
+        validator = ConfigValidator("config/settings.json")
+        settings = await validator.validate_config()
+        private_keys = await ConfigValidator.resolve_all_private_keys()
+        scheduler_settings = {**DEFAULT_SCHEDULER_SETTINGS, **settings.get("scheduler", {})}
+
+        async with ChainRegistry.from_settings(settings) as registry:
+            engine = await registry.get(settings["network"])
+            clients = [Client(engine, WalletContext(private_key, settings["proxy"])) for private_key in private_keys.values()]
+
+            max_base_fee_gwei = scheduler_settings["max_base_fee_gwei"]
+            scheduler = FeeScheduler(
+                engine.w3(),
+                max_base_fee=int(max_base_fee_gwei * 10 ** 9) if max_base_fee_gwei is not None else None,
+                percentile=scheduler_settings["percentile"],
+                window=scheduler_settings["window"],
+                rate=scheduler_settings["rate"],
+                deadline=scheduler_settings["deadline_minutes"] * 60,
+                poll_interval=scheduler_settings["poll_interval"]
+            )
+
+            # ETH вносится через wrap в WETH, USDC — напрямую
+            if settings["token"] == "ETH":
+                decimals, run = 18, deposit_native
+            else:
+                decimals, run = await engine.decimals(engine.usdc_address), deposit
+
+            # Суммы всех кошельков разбираются один раз, целочисленно
+            wallet_amounts = settings.get("wallet_amounts", {})
+            amounts = TokenAmount.parse_many([wallet_amounts.get(name, settings["amount"]) for name in private_keys], decimals)
+
+            for client, amount in zip(clients, amounts):
+                scheduler.submit(client.address, lambda client=client, amount_in=amount.raw: run(client, amount_in))
+
+            jobs = await scheduler.run()
+
+            succeeded = sum(1 for job in jobs if job.result)
+            forced = sum(1 for job in jobs if job.forced)
+            logger.info(f"🎉 Депозитов выполнено: {succeeded}/{len(jobs)}, по дедлайну: {forced}")
+
+    except Exception as e:
+        logger.error(f"Произошла ошибка в планировщике: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
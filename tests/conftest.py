@@ -0,0 +1,137 @@
+from web3.providers.async_base import AsyncBaseProvider
+from client.engine import WalletContext
+from client.client import Client
+from types import SimpleNamespace
+from eth_utils import keccak
+from web3 import AsyncWeb3
+import asyncio
+import json
+
+PRIVATE_KEY = "0x" + "11" * 32
+USDC = "0x176211869cA2b568f2A7D4EE941E073a821EE1ff"
+WETH = "0xe5D7C2a44FfDDf6b295A15c148167daaAf5Cf34f"
+POOL = "0x2f9bB73a8e98793e26Cb2F6C4ad037BDf1C6B269"
+ADDRESS = WalletContext(PRIVATE_KEY).address
+
+
+class ScriptedProvider(AsyncBaseProvider):
+    """Провайдер, который отвечает или падает по заранее заданному сценарию (последний ответ повторяется)"""
+
+    endpoint_uri = "https://stub"
+
+    def __init__(self, outcomes: list):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def make_request(self, method, params):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+
+async def value(result):
+    return result
+
+
+class StubEth:
+    """`w3.eth` локальной сети: блоки, комиссии, nonce и ошибки отправки задаются из теста"""
+
+    def __init__(self, base_fee: int = 100, history: list[int] = (), block_number: int = 0, nonce: int = 0,
+                 send_errors: list = ()):
+        self.base_fee = base_fee
+        self.history = list(history)
+        self.block_number = block_number
+        self.nonce = nonce
+        self.send_errors = list(send_errors)
+        self.sent = []
+        self.calls = 0
+
+    @property
+    def max_priority_fee(self):
+        return value(10)
+
+    async def fee_history(self, block_count: int, newest_block: str, reward_percentiles=None) -> dict:
+        return {"baseFeePerGas": [*self.history[-block_count:], self.base_fee]}
+
+    async def get_block(self, block_identifier) -> dict:
+        self.calls += 1
+        return {"number": self.block_number, "baseFeePerGas": self.base_fee}
+
+    async def get_transaction_count(self, address, block_identifier) -> int:
+        return self.nonce
+
+    async def send_raw_transaction(self, raw_tx):
+        if self.send_errors:
+            raise ValueError(self.send_errors.pop(0))
+        self.sent.append(raw_tx)
+
+
+def stub_w3(**kwargs) -> SimpleNamespace:
+    return SimpleNamespace(eth=StubEth(**kwargs), to_hex=AsyncWeb3.to_hex,
+                           to_checksum_address=AsyncWeb3.to_checksum_address)
+
+
+class StubWithdraw:
+    async def estimate_gas(self, tx: dict) -> int:
+        return 200_000
+
+    async def build_transaction(self, tx: dict) -> dict:
+        return dict(tx)
+
+
+class StubClient:
+    """
+    Клиент кошелька без сети: баланс, комиссии, allowance, отправка и подтверждение
+    задаются из теста, подпись — детерминированный хэш полей транзакции.
+    """
+
+    fee_fields = staticmethod(Client.fee_fields)
+    max_fee_per_gas = staticmethod(Client.max_fee_per_gas)
+
+    def __init__(self, confirmed: bool = True, fees: dict = None, allowance: int = 0, wallet_nonce: int = 5,
+                 balance: int = 10 ** 6, **eth):
+        self.wallet = WalletContext(PRIVATE_KEY)
+        self.wallet.nonce = wallet_nonce
+        self.address = self.wallet.address
+        self.engine = SimpleNamespace(semaphore=asyncio.Semaphore(4), weth_address=WETH)
+        self.network = SimpleNamespace(name="LINEA")
+        self.usdc_address = USDC
+        self.pool_address = POOL
+        self.chain_id = 59144
+        self.explorer_url = ""
+        self.broadcaster = None
+        self.w3 = stub_w3(**eth)
+        self.fees = fees or {}
+        self.allowance = allowance
+        self.balance = balance
+        self.confirmed = confirmed
+        self.waited = asyncio.Event()
+
+    async def to_wei_main(self, number, token_address=None) -> int:
+        return int(number)
+
+    async def get_erc20_balance(self) -> int:
+        return self.balance
+
+    async def get_allowance(self, token_address: str, owner: str, spender: str) -> int:
+        return self.allowance
+
+    async def prepare_tx(self, value: int = 0) -> dict:
+        return {"nonce": self.wallet.nonce, "value": value, **self.fees}
+
+    async def wait_tx(self, tx_hash, explorer_url=None) -> bool:
+        self.waited.set()
+        return self.confirmed
+
+    async def get_contract(self, address: str, abi: list):
+        return SimpleNamespace(functions=SimpleNamespace(withdraw=lambda asset, amount, to: StubWithdraw()))
+
+    def sign(self, tx: dict):
+        raw = json.dumps(tx, sort_keys=True).encode("utf-8")
+        return SimpleNamespace(raw_transaction=raw, hash=keccak(raw))
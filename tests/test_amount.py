@@ -0,0 +1,59 @@
+from utils.amount import TokenAmount
+from decimal import Decimal
+import pytest
+
+
+@pytest.mark.parametrize("value, raw", [
+    ("0.25", 250_000),
+    (0.25, 250_000),
+    (1, 1_000_000),
+    (".5", 500_000),
+    ("12.3400", 12_340_000),
+    (1e-05, 10),
+    (Decimal("1E-6"), 1),
+])
+def test_parse_is_exact(value, raw):
+    assert TokenAmount.parse(value, 6).raw == raw
+
+
+@pytest.mark.parametrize("value", ["", "abc", "-1", "1e5", True, float("nan"), "0.0000001"])
+def test_parse_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        TokenAmount.parse(value, 6)
+
+
+def test_parse_many_uses_one_decimals():
+    assert [amount.raw for amount in TokenAmount.parse_many(["1", "0.5", 2], 6)] == [1_000_000, 500_000, 2_000_000]
+
+
+def test_format_without_network():
+    amount = TokenAmount(1_234_567, 6)
+    assert str(amount) == "1.234567"
+    assert f"{amount:.2f}" == "1.23"
+    assert f"{TokenAmount(5, 0):.2f}" == "5.00"
+    assert str(TokenAmount(1_500_000, 6)) == "1.5"
+
+
+def test_equality_and_hash_agree():
+    amount = TokenAmount(5, 0)
+    assert amount == TokenAmount(5, 0)
+    assert hash(amount) == hash(TokenAmount(5, 0))
+    assert amount != 5
+    assert len({amount, TokenAmount(5, 0), TokenAmount(5, 6)}) == 2
+
+
+def test_different_decimals_do_not_compare():
+    usdc, eth = TokenAmount.parse("1", 6), TokenAmount.parse("1", 18)
+    assert usdc != eth
+    with pytest.raises(TypeError):
+        usdc < eth
+    with pytest.raises(TypeError):
+        usdc + eth
+
+
+def test_arithmetic_keeps_decimals():
+    total = TokenAmount.parse("1", 6) + TokenAmount.parse("0.5", 6)
+    assert total == TokenAmount.parse("1.5", 6)
+    assert TokenAmount.parse("1", 6) - TokenAmount.parse("0.25", 6) == TokenAmount(750_000, 6)
+    with pytest.raises(ValueError):
+        TokenAmount.parse("0.25", 6) - TokenAmount.parse("1", 6)
@@ -0,0 +1,76 @@
+from client.cassette import Cassette, CassetteProvider, RecordedError, RECORD, REPLAY
+from client.ratelimit import RateLimitedError
+from conftest import ScriptedProvider
+import asyncio
+import pytest
+
+
+class CustomError(Exception):
+    def __init__(self, code: int):
+        self.code = code
+        super().__init__(f"code {code}")
+
+
+async def record(path, outcomes: list) -> None:
+    cassette = Cassette(str(path), RECORD)
+    provider = CassetteProvider(ScriptedProvider(outcomes), cassette)
+    for _ in range(len(outcomes)):
+        try:
+            await provider.make_request("eth_getBalance", ["0x01", "latest"])
+        except Exception:
+            pass
+    cassette.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_responses_and_reraises_errors(tmp_path):
+    path = tmp_path / "incident.jsonl.gz"
+    await record(path, [
+        {"jsonrpc": "2.0", "id": 1, "result": "0x10"},
+        asyncio.TimeoutError(),
+        RateLimitedError("https://linea.drpc.org", 2.5),
+        ConnectionResetError(104, "Connection reset by peer"),
+        {"jsonrpc": "2.0", "id": 5, "result": "0x20"},
+    ])
+
+    provider = CassetteProvider(None, Cassette(str(path), REPLAY))
+
+    def call():
+        return provider.make_request("eth_getBalance", ["0x01", "latest"])
+
+    assert (await call())["result"] == "0x10"
+    with pytest.raises(asyncio.TimeoutError):
+        await call()
+    with pytest.raises(RateLimitedError) as throttled:
+        await call()
+    assert throttled.value.endpoint == "https://linea.drpc.org"
+    assert throttled.value.retry_after == 2.5
+    assert str(throttled.value) == str(RateLimitedError("https://linea.drpc.org", 2.5))
+    with pytest.raises(ConnectionResetError, match="Connection reset by peer"):
+        await call()
+    assert (await call())["result"] == "0x20"
+
+
+@pytest.mark.asyncio
+async def test_custom_error_is_restored_with_fields(tmp_path):
+    path = tmp_path / "incident.jsonl.gz"
+    await record(path, [CustomError(7)])
+
+    provider = CassetteProvider(None, Cassette(str(path), REPLAY))
+    with pytest.raises(CustomError) as error:
+        await provider.make_request("eth_getBalance", ["0x01", "latest"])
+    assert error.value.code == 7
+
+
+@pytest.mark.asyncio
+async def test_unrestorable_error_replays_as_recorded_error(tmp_path):
+    path = tmp_path / "incident.jsonl.gz"
+    await record(path, [CustomError(7)])
+
+    cassette = Cassette(str(path), REPLAY)
+    # Тип, которого нет среди загруженных модулей, не импортируется из кассеты
+    entry = cassette.lookup("eth_getBalance", ["0x01", "latest"])
+    entry["e"]["type"] = "missing.module:CustomError"
+
+    with pytest.raises(RecordedError, match="code 7"):
+        await CassetteProvider(None, cassette).make_request("eth_getBalance", ["0x01", "latest"])
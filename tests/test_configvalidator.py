@@ -0,0 +1,35 @@
+from config.configvalidator import ConfigValidator
+import pytest
+
+PRIVATE_KEY = "0x" + "11" * 32
+
+
+@pytest.mark.asyncio
+async def test_private_keys_are_resolved_from_one_env_map(monkeypatch):
+    monkeypatch.setenv("PRIVATE_KEYS", f'{{"main": "{PRIVATE_KEY}"}}')
+
+    assert await ConfigValidator.resolve_private_key("ENV:main") == PRIVATE_KEY
+    assert await ConfigValidator.resolve_private_key(PRIVATE_KEY) == PRIVATE_KEY
+    assert await ConfigValidator.resolve_all_private_keys() == {"main": PRIVATE_KEY}
+
+
+@pytest.mark.parametrize("raw", [None, "{broken", "[1, 2]"])
+@pytest.mark.asyncio
+async def test_missing_or_invalid_env_map_exits(monkeypatch, raw):
+    if raw is None:
+        monkeypatch.delenv("PRIVATE_KEYS", raising=False)
+    else:
+        monkeypatch.setenv("PRIVATE_KEYS", raw)
+
+    with pytest.raises(SystemExit):
+        await ConfigValidator.resolve_all_private_keys()
+    with pytest.raises(SystemExit):
+        await ConfigValidator.resolve_private_key("ENV:main")
+
+
+@pytest.mark.asyncio
+async def test_unknown_key_name_exits(monkeypatch):
+    monkeypatch.setenv("PRIVATE_KEYS", f'{{"main": "{PRIVATE_KEY}"}}')
+
+    with pytest.raises(SystemExit):
+        await ConfigValidator.resolve_private_key("ENV:other")
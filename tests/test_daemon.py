@@ -0,0 +1,135 @@
+from conftest import PRIVATE_KEY, StubClient
+from utils.daemon import DepositDaemon
+import utils.daemon
+import asyncio
+import json
+import stat
+import os
+import pytest
+
+TX_HASH = "0x" + "ab" * 32
+
+
+@pytest.fixture
+def make_daemon(monkeypatch, tmp_path):
+    async def approve_if_needed(client, amount_in):
+        pass
+
+    async def supply(client, amount_in):
+        # Отправленная транзакция сдвигает локальный nonce
+        client.wallet.nonce += 1
+        return TX_HASH
+
+    monkeypatch.setattr(utils.daemon, "approve_if_needed", approve_if_needed)
+    monkeypatch.setattr(utils.daemon, "supply", supply)
+
+    def make(client: StubClient) -> DepositDaemon:
+        daemon = DepositDaemon(None, {"main": PRIVATE_KEY}, "LINEA", events_path=str(tmp_path / "events.jsonl"))
+        daemon.locks[("LINEA", client.address)] = asyncio.Lock()
+
+        async def find_client(network, wallet):
+            return client
+        daemon.find_client = find_client
+        return daemon
+    return make
+
+
+@pytest.mark.asyncio
+async def test_failed_wait_resyncs_nonce(make_daemon):
+    client = StubClient(confirmed=False)
+    events = []
+
+    async def emit(event):
+        events.append(event)
+
+    await make_daemon(client).run_job({"id": 1, "wallet": "main", "amount": 100}, emit)
+
+    assert [event["status"] for event in events] == ["accepted", "approving", "sent", "failed"]
+    assert client.wallet.nonce is None
+
+
+@pytest.mark.asyncio
+async def test_confirmed_job_keeps_local_nonce(make_daemon):
+    client = StubClient(confirmed=True)
+    events = []
+
+    async def emit(event):
+        events.append(event)
+
+    await make_daemon(client).run_job({"id": 1, "wallet": "main", "amount": 100}, emit)
+
+    assert events[-1]["status"] == "confirmed"
+    assert client.wallet.nonce == 6
+
+
+@pytest.mark.asyncio
+async def test_socket_is_private_and_disconnect_does_not_abort_job(make_daemon, tmp_path):
+    client = StubClient(confirmed=True)
+    daemon = make_daemon(client)
+    path = str(tmp_path / "daemon.sock")
+
+    server = asyncio.create_task(daemon.serve_socket(path))
+    try:
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b'{"id": 1, "wallet": "main", "amount": 100}\n')
+        await writer.drain()
+        writer.close()
+
+        # Клиент ушёл, но отправленная транзакция всё равно дожидается подтверждения
+        await asyncio.wait_for(client.waited.wait(), timeout=5)
+        assert client.wallet.nonce == 6
+    finally:
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_non_object_lines_are_rejected_over_socket(make_daemon, tmp_path):
+    daemon = make_daemon(StubClient(confirmed=True))
+    path = str(tmp_path / "daemon.sock")
+
+    server = asyncio.create_task(daemon.serve_socket(path))
+    try:
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b'[1, 2]\n"x"\n5\n{broken\n')
+        writer.write_eof()
+
+        output = await asyncio.wait_for(reader.read(), timeout=5)
+        events = [json.loads(line) for line in output.decode().splitlines()]
+        writer.close()
+    finally:
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+
+    assert [event["status"] for event in events] == ["failed"] * 4
+    assert "JSON-объектом" in events[0]["error"]
+    assert "Некорректный JSON" in events[3]["error"]
+
+
+@pytest.mark.asyncio
+async def test_non_object_lines_are_rejected_from_jsonl(make_daemon, tmp_path):
+    daemon = make_daemon(StubClient(confirmed=True))
+    jobs_path = tmp_path / "jobs.jsonl"
+    jobs_path.write_text('[1, 2]\n5\n', encoding="utf-8")
+
+    tail = asyncio.create_task(daemon.tail_jsonl(str(jobs_path), from_start=True, poll_interval=0.01))
+    events_path = tmp_path / "events.jsonl"
+
+    async def wait_events():
+        while not events_path.exists() or len(events_path.read_text(encoding="utf-8").splitlines()) < 2:
+            await asyncio.sleep(0.01)
+    try:
+        await asyncio.wait_for(wait_events(), timeout=5)
+    finally:
+        tail.cancel()
+        await asyncio.gather(tail, return_exceptions=True)
+
+    events = [json.loads(line) for line in events_path.read_text(encoding="utf-8").splitlines()]
+    assert [event["status"] for event in events] == ["failed", "failed"]
+    assert daemon.tasks == set()
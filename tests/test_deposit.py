@@ -0,0 +1,21 @@
+from utils.deposit import native_deposit_gas, APPROVE_GAS_LIMIT, SUPPLY_GAS_LIMIT
+from utils.wrappers import WRAP_GAS_LIMIT
+from conftest import StubClient
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_reserve_covers_every_gas_limit_at_max_fee():
+    eip_1559 = {"maxFeePerGas": 150, "maxPriorityFeePerGas": 10, "type": "0x2"}
+    fees, reserve = await native_deposit_gas(StubClient(fees=eip_1559, allowance=0), 10 ** 18)
+
+    assert fees == eip_1559
+    assert reserve == (WRAP_GAS_LIMIT + APPROVE_GAS_LIMIT + SUPPLY_GAS_LIMIT) * 150
+
+
+@pytest.mark.asyncio
+async def test_reserve_skips_approve_when_allowance_is_enough():
+    fees, reserve = await native_deposit_gas(StubClient(fees={"gasPrice": 40}, allowance=2 ** 256 - 1), 10 ** 18)
+
+    assert fees == {"gasPrice": 40}
+    assert reserve == (WRAP_GAS_LIMIT + SUPPLY_GAS_LIMIT) * 40
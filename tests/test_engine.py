@@ -0,0 +1,35 @@
+from client.engine import ChainRegistry, ERC20_ABI
+from client.ratelimit import RequestScheduler
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_registry_reuses_engine_and_closes_cassette(tmp_path):
+    settings = {"broadcast": True, "cassette": {"path": str(tmp_path / "run.jsonl.gz")}}
+
+    async with ChainRegistry.from_settings(settings) as registry:
+        engine = await registry.get("linea")
+        assert engine is await registry.get("LINEA")
+        # С кассетой рассылка отключена, а контракты кэшируются по одному ABI
+        assert engine.broadcaster_for() is None
+        assert engine.contract(engine.usdc_address, ERC20_ABI) is engine.contract(engine.usdc_address, ERC20_ABI)
+
+    assert registry.cassette._file is None
+    # Планировщики привязаны к циклу событий и не переживают реестр
+    assert RequestScheduler._instances == {}
+
+
+@pytest.mark.asyncio
+async def test_registry_closes_broadcaster_sessions():
+    async with ChainRegistry.from_settings({"broadcast": True}) as registry:
+        engine = await registry.get("LINEA")
+        session = engine.broadcaster_for().session
+
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_registry_rejects_unknown_network():
+    async with ChainRegistry.from_settings({}) as registry:
+        with pytest.raises(ValueError):
+            await registry.get("UNKNOWN")
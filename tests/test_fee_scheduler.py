@@ -0,0 +1,124 @@
+from utils.fee_scheduler import FeeScheduler
+from client.ratelimit import RateLimitedError
+from conftest import stub_w3
+import asyncio
+import pytest
+
+POLL_INTERVAL = 0.05
+RATE = 20
+
+
+def make_job(calls: list, name: str):
+    async def run():
+        calls.append((name, asyncio.get_running_loop().time()))
+        return name
+    return run
+
+
+@pytest.mark.asyncio
+async def test_jobs_held_while_base_fee_above_threshold():
+    w3 = stub_w3(history=[100] * 5, base_fee=200)
+    scheduler = FeeScheduler(w3, max_base_fee=100, rate=RATE, poll_interval=POLL_INTERVAL)
+    calls = []
+    jobs = [scheduler.submit(f"job-{i}", make_job(calls, f"job-{i}")) for i in range(3)]
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(POLL_INTERVAL * 5)
+
+    assert calls == []
+    assert all(job.released_at is None for job in jobs)
+    assert len(scheduler.queue) == 3
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_jobs_released_at_rate_when_base_fee_drops():
+    w3 = stub_w3(history=[100] * 5, base_fee=200)
+    scheduler = FeeScheduler(w3, max_base_fee=100, rate=RATE, poll_interval=POLL_INTERVAL)
+    calls = []
+    jobs = [scheduler.submit(f"job-{i}", make_job(calls, f"job-{i}")) for i in range(4)]
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(POLL_INTERVAL * 3)
+    assert calls == []
+
+    w3.eth.base_fee = 90
+    finished = await asyncio.wait_for(task, timeout=5)
+
+    assert finished == jobs
+    assert [name for name, _ in calls] == ["job-0", "job-1", "job-2", "job-3"]
+    assert all(job.result == job.name and not job.forced and job.base_fee == 90 for job in jobs)
+    gaps = [later - earlier for (_, earlier), (_, later) in zip(calls, calls[1:])]
+    assert min(gaps) >= 1 / RATE * 0.8
+
+
+@pytest.mark.asyncio
+async def test_percentile_threshold_follows_fee_history():
+    w3 = stub_w3(history=[10, 20, 30, 40, 50], base_fee=45)
+    scheduler = FeeScheduler(w3, percentile=50, window=5, rate=RATE, poll_interval=POLL_INTERVAL)
+
+    assert await scheduler.get_fee_window() == (45, 30)
+
+    calls = []
+    job = scheduler.submit("job", make_job(calls, "job"))
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(POLL_INTERVAL * 3)
+    assert calls == []
+
+    w3.eth.base_fee = 25
+    await asyncio.wait_for(task, timeout=5)
+    assert job.result == "job" and not job.forced
+
+
+@pytest.mark.asyncio
+async def test_deadline_forces_job_through_high_base_fee():
+    w3 = stub_w3(history=[100] * 5, base_fee=500)
+    scheduler = FeeScheduler(w3, max_base_fee=100, rate=RATE, poll_interval=POLL_INTERVAL)
+    calls = []
+    urgent = scheduler.submit("urgent", make_job(calls, "urgent"), deadline=POLL_INTERVAL * 2)
+    waiting = scheduler.submit("waiting", make_job(calls, "waiting"))
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.wait_for(urgent.done.wait(), timeout=5)
+
+    assert urgent.forced is True
+    assert urgent.result == "urgent"
+    assert urgent.base_fee == 500
+    assert waiting.released_at is None
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_deadline_forces_job_while_fee_history_fails():
+    w3 = stub_w3(history=[100] * 5, base_fee=50)
+
+    async def fee_history(block_count, newest_block, reward_percentiles=None):
+        raise RateLimitedError("https://linea.drpc.org")
+    w3.eth.fee_history = fee_history
+
+    scheduler = FeeScheduler(w3, max_base_fee=100, rate=RATE, poll_interval=POLL_INTERVAL)
+    calls = []
+    urgent = scheduler.submit("urgent", make_job(calls, "urgent"), deadline=POLL_INTERVAL * 2)
+    waiting = scheduler.submit("waiting", make_job(calls, "waiting"))
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.wait_for(urgent.done.wait(), timeout=5)
+
+    assert urgent.forced is True
+    assert urgent.result == "urgent"
+    assert urgent.base_fee is None
+    # Без известной комиссии остальные задачи не выпускаются раньше дедлайна
+    assert waiting.released_at is None
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_percentile_of_nearest_rank():
+    assert FeeScheduler.percentile_of([50, 10, 30, 20, 40], 0) == 10
+    assert FeeScheduler.percentile_of([50, 10, 30, 20, 40], 50) == 30
+    assert FeeScheduler.percentile_of([50, 10, 30, 20, 40], 100) == 50
@@ -0,0 +1,98 @@
+from client.ratelimit import (RateLimitedError, RateLimitedProvider, RequestScheduler, PRIORITY_SEND, PRIORITY_READ,
+                              throttling_middleware, parse_retry_after, is_throttled_response)
+from conftest import ScriptedProvider
+from aiohttp import ClientResponseError
+from web3 import AsyncWeb3
+import client.ratelimit
+import asyncio
+import pytest
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+THROTTLED = {"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": "Too many requests"}}
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(client.ratelimit, "INITIAL_BACKOFF", 0.01)
+
+
+@pytest.mark.asyncio
+async def test_websocket_throttling_raises_instead_of_generic_error():
+    provider = ScriptedProvider([THROTTLED])
+    provider.endpoint_uri = "wss://stub"
+    w3 = AsyncWeb3(provider)
+    w3.middleware_onion.add(throttling_middleware, name="throttling")
+
+    with pytest.raises(RateLimitedError) as error:
+        await w3.eth.get_balance(ADDRESS)
+    assert error.value.endpoint == "wss://stub"
+
+
+@pytest.mark.asyncio
+async def test_provider_retries_429_and_jsonrpc_throttling():
+    stub = ScriptedProvider([
+        ClientResponseError(None, (), status=429, headers={"Retry-After": "0.01"}),
+        THROTTLED,
+        {"jsonrpc": "2.0", "id": 1, "result": "0x10"},
+    ])
+    w3 = AsyncWeb3(RateLimitedProvider(stub, RequestScheduler("https://stub", rate=1000, burst=10)))
+
+    assert await w3.eth.get_balance(ADDRESS) == 16
+    assert stub.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_provider_gives_up_with_rate_limited_error():
+    stub = ScriptedProvider([ClientResponseError(None, (), status=429, headers={})])
+    provider = RateLimitedProvider(stub, RequestScheduler("https://stub", rate=1000, burst=10), max_retries=2)
+
+    with pytest.raises(RateLimitedError):
+        await provider.make_request("eth_getBalance", [ADDRESS, "latest"])
+    assert stub.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_sends_before_reads():
+    scheduler = RequestScheduler("https://stub", rate=50, burst=1)
+    order = []
+
+    async def request(name, priority):
+        await scheduler.acquire(priority)
+        order.append(name)
+
+    await asyncio.gather(*(request(f"read-{i}", PRIORITY_READ) for i in range(3)), request("send", PRIORITY_SEND))
+
+    assert order[0] == "read-0"
+    assert order[1] == "send"
+
+
+def test_scheduler_survives_event_loop_that_ended_with_pending_waiter():
+    scheduler = RequestScheduler("https://stub", rate=20, burst=1)
+
+    async def leave_waiter():
+        await scheduler.acquire()
+        # Ожидающий с таймером остаётся, когда цикл событий завершается
+        asyncio.get_running_loop().create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+
+    asyncio.run(leave_waiter())
+    asyncio.run(asyncio.wait_for(scheduler.acquire(), timeout=2))
+
+
+def test_close_all_clears_registry():
+    scheduler = RequestScheduler.get("https://stub", "proxy")
+    assert RequestScheduler.get("https://stub", "proxy") is scheduler
+
+    RequestScheduler.close_all()
+    assert RequestScheduler.get("https://stub", "proxy") is not scheduler
+    RequestScheduler.close_all()
+
+
+def test_throttling_detection_and_retry_after():
+    assert is_throttled_response(THROTTLED)
+    assert is_throttled_response({"error": {"code": 1, "message": "Rate limit exceeded"}})
+    assert not is_throttled_response({"error": {"code": 3, "message": "execution reverted"}})
+    assert not is_throttled_response({"result": "0x0"})
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after(None) is None
@@ -0,0 +1,117 @@
+from websockets.asyncio.server import serve
+from client.transport import HeadsTransport
+from conftest import stub_w3
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import client.transport
+import asyncio
+import json
+import time
+import pytest
+
+
+def head(number: int) -> str:
+    return json.dumps({"jsonrpc": "2.0", "method": "eth_subscription",
+                       "params": {"subscription": "0xheads", "result": {"number": hex(number), "baseFeePerGas": "0x7"}}})
+
+
+async def wait_until(predicate, timeout: float = 5) -> None:
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.fixture
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(client.transport, "INITIAL_BACKOFF", 0.2)
+    monkeypatch.setattr(client.transport, "HTTP_POLL_INTERVAL", 0.05)
+
+
+@asynccontextmanager
+async def run_node(heads: list, drop_first: bool = False):
+    """WebSocket-нода: отвечает на eth_subscribe, шлёт блок и по желанию теста обрывает первое соединение"""
+    state = SimpleNamespace(connections=0, heads=heads, drop_first=drop_first)
+
+    async def handler(ws):
+        state.connections += 1
+        connection = state.connections
+        async for message in ws:
+            request = json.loads(message)
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "0xheads"}))
+            await ws.send(head(state.heads[min(connection, len(state.heads)) - 1]))
+            if state.drop_first and connection == 1:
+                ws.transport.abort()
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        state.url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        yield state
+
+
+@pytest.mark.asyncio
+async def test_dropped_socket_falls_back_to_http_and_reconnects(fast_reconnect):
+    http_w3 = stub_w3(block_number=5)
+    bystander = asyncio.create_task(asyncio.sleep(30))
+
+    async with run_node([1, 10], drop_first=True) as node:
+        transport = HeadsTransport(node.url, http_w3)
+        await transport.start()
+        try:
+            # Обрыв: блоки идут по HTTP, пока сокет не восстановлен
+            await wait_until(lambda: http_w3.eth.calls > 0)
+            assert transport.block_number == 5
+            await wait_until(lambda: transport.block_number == 10)
+            assert node.connections == 2
+            assert transport.connected
+            assert not bystander.done()
+        finally:
+            bystander.cancel()
+            await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_silent_socket_is_treated_as_dropped(fast_reconnect, monkeypatch):
+    monkeypatch.setattr(client.transport, "HEAD_TIMEOUT", 0.2)
+    http_w3 = stub_w3(block_number=5)
+
+    async with run_node([1]) as node:
+        transport = HeadsTransport(node.url, http_w3)
+        await transport.start()
+        try:
+            await wait_until(lambda: transport.connected)
+            # После первого блока нода молчит: транспорт переходит на HTTP и переподключается
+            await wait_until(lambda: http_w3.eth.calls > 0)
+            await wait_until(lambda: node.connections == 2)
+        finally:
+            await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_connection_does_not_spin():
+    async with run_node([1]) as node:
+        transport = HeadsTransport(node.url, stub_w3())
+        await transport.start()
+        try:
+            await wait_until(lambda: transport.connected and transport.block_number == 1)
+            started = time.process_time()
+            await asyncio.sleep(0.5)
+            assert time.process_time() - started < 0.1
+        finally:
+            await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_requests_go_over_socket_and_fail_when_it_closes():
+    async with run_node([1]) as node:
+        transport = HeadsTransport(node.url, stub_w3())
+        await transport.start()
+        try:
+            await wait_until(lambda: transport.connected)
+            provider = transport.ws_w3.provider
+            assert (await provider.make_request("eth_chainId", []))["result"] == "0xheads"
+
+            await provider._ws.close()
+            with pytest.raises(ConnectionError):
+                await provider.make_request("eth_chainId", [])
+        finally:
+            await transport.close()
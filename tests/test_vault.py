@@ -0,0 +1,100 @@
+from utils.vault import EmergencyVault, FEE_MULTIPLIER
+from conftest import ADDRESS, USDC, StubClient
+import pytest
+
+OTHER_ASSET = "0xA219439258ca9da29E9Cc4cE5596924745e12B93"
+PASSWORD = "correct horse"
+
+
+def make_vault(tmp_path, client: StubClient, password: str = PASSWORD, asset: str = USDC) -> EmergencyVault:
+    return EmergencyVault([client], asset, password, path=str(tmp_path / "vault.bin"))
+
+
+@pytest.mark.asyncio
+async def test_save_and_load_round_trip(tmp_path):
+    vault = make_vault(tmp_path, StubClient(nonce=7))
+    assert await vault.refresh(force=True) == 1
+
+    loaded = make_vault(tmp_path, StubClient(nonce=7))
+    loaded.load()
+
+    assert loaded.entries == vault.entries
+    entry = loaded.entries[ADDRESS]
+    assert entry["nonce"] == 7
+    assert entry["max_fee"] == 100 * FEE_MULTIPLIER + 10
+
+
+@pytest.mark.asyncio
+async def test_wrong_password_or_tampered_file_is_rejected(tmp_path):
+    await make_vault(tmp_path, StubClient(nonce=7)).refresh(force=True)
+
+    with pytest.raises(ValueError, match="пароль"):
+        make_vault(tmp_path, StubClient(nonce=7), password="wrong").load()
+
+    path = tmp_path / "vault.bin"
+    blob = bytearray(path.read_bytes())
+    blob[-1] ^= 0x01
+    path.write_bytes(bytes(blob))
+    with pytest.raises(ValueError, match="повреждён"):
+        make_vault(tmp_path, StubClient(nonce=7)).load()
+
+
+@pytest.mark.asyncio
+async def test_vault_for_other_asset_is_rejected(tmp_path):
+    await make_vault(tmp_path, StubClient(nonce=7)).refresh(force=True)
+
+    with pytest.raises(ValueError, match="другого актива"):
+        make_vault(tmp_path, StubClient(nonce=7), asset=OTHER_ASSET).load()
+
+
+def test_is_stale_on_nonce_and_fee_drift():
+    entry = {"nonce": 7, "max_fee": 100 * FEE_MULTIPLIER + 10, "max_priority_fee": 10}
+
+    assert not EmergencyVault.is_stale(entry, 7, 100)
+    assert not EmergencyVault.is_stale(entry, 7, 200)
+    assert EmergencyVault.is_stale(entry, 8, 100)
+    assert EmergencyVault.is_stale(entry, 7, 201)
+
+
+@pytest.mark.asyncio
+async def test_nonce_too_low_resigns_sends_and_persists(tmp_path):
+    client = StubClient(nonce=7, send_errors=["nonce too low"])
+    vault = make_vault(tmp_path, client)
+    await vault.refresh(force=True)
+    stale = vault.entries[ADDRESS]
+
+    # Кошелёк успел отправить транзакцию после подписи хранилища
+    client.w3.eth.nonce = 8
+    tx_hash = await vault.broadcast_wallet(ADDRESS, stale)
+
+    fresh = vault.entries[ADDRESS]
+    assert fresh["nonce"] == 8
+    assert tx_hash == fresh["tx_hash"] != stale["tx_hash"]
+    assert client.w3.eth.sent == [fresh["raw_tx"]]
+
+    # На диске переподписанная транзакция, а не устаревшая
+    loaded = make_vault(tmp_path, StubClient(nonce=7))
+    loaded.load()
+    assert loaded.entries[ADDRESS] == fresh
+
+
+@pytest.mark.asyncio
+async def test_already_known_keeps_signed_transaction(tmp_path):
+    client = StubClient(nonce=7, send_errors=["already known"])
+    vault = make_vault(tmp_path, client)
+    await vault.refresh(force=True)
+    entry = vault.entries[ADDRESS]
+
+    assert await vault.broadcast_wallet(ADDRESS, entry) == entry["tx_hash"]
+    assert vault.entries[ADDRESS] is entry
+    assert client.w3.eth.sent == []
+
+
+@pytest.mark.asyncio
+async def test_other_send_errors_are_raised(tmp_path):
+    client = StubClient(nonce=7, send_errors=["insufficient funds for gas"])
+    vault = make_vault(tmp_path, client)
+    await vault.refresh(force=True)
+
+    with pytest.raises(ValueError, match="insufficient funds"):
+        await vault.broadcast_wallet(ADDRESS, vault.entries[ADDRESS])
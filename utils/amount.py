@@ -0,0 +1,122 @@
+from typing import Iterable, List, Union
+from decimal import Decimal
+import re
+
+AMOUNT_PATTERN = re.compile(r"^\s*(?P<int>\d*)(?:\.(?P<frac>\d*))?\s*$")
+FORMAT_SPEC_PATTERN = re.compile(r"^\.(?P<places>\d+)f$")
+
+AmountLike = Union[str, int, float, Decimal]
+
+
+class TokenAmount:
+    """
+    Сумма токена в целых минимальных единицах вместе с decimals токена.
+
+    Строки из конфигурации разбираются целочисленно, без промежуточного float,
+    а форматирование для вывода не требует обращения к сети.
+    """
+
+    __slots__ = ("raw", "decimals")
+
+    def __init__(self, raw: int, decimals: int):
+        if raw < 0:
+            raise ValueError(f"Сумма не может быть отрицательной: {raw}")
+        self.raw = raw
+        self.decimals = decimals
+
+    @classmethod
+    def parse(cls, value: AmountLike, decimals: int) -> "TokenAmount":
+        """Разбор суммы вида "0.25" в минимальные единицы токена"""
+        if isinstance(value, bool):
+            raise ValueError(f"Некорректная сумма: {value!r}")
+        if isinstance(value, int):
+            return cls(value * 10 ** decimals, decimals)
+        if isinstance(value, float):
+            # repr даёт кратчайшую десятичную запись числа из JSON (0.25 -> "0.25", 1e-05 -> "1e-05")
+            value = Decimal(repr(value))
+        text = format(value, "f") if isinstance(value, Decimal) else str(value)
+
+        match = AMOUNT_PATTERN.match(text)
+        if not match or not (match["int"] or match["frac"]):
+            raise ValueError(f"Некорректная сумма: {value!r}")
+
+        fraction = (match["frac"] or "").rstrip("0")
+        if len(fraction) > decimals:
+            raise ValueError(f"У суммы {value!r} больше знаков после запятой, чем decimals токена ({decimals})")
+
+        return cls(int(match["int"] or 0) * 10 ** decimals + int(fraction.ljust(decimals, "0") or 0), decimals)
+
+    @classmethod
+    def parse_many(cls, values: Iterable[AmountLike], decimals: int) -> List["TokenAmount"]:
+        """Разбор списка сумм (например, для всех кошельков) с одними decimals"""
+        return [cls.parse(value, decimals) for value in values]
+
+    def format(self, places: int = None) -> str:
+        """Десятичная запись суммы; `places` обрезает дробную часть до нужного числа знаков"""
+        whole, fraction = divmod(self.raw, 10 ** self.decimals)
+        fraction_text = str(fraction).rjust(self.decimals, "0") if self.decimals else ""
+        if places is None:
+            fraction_text = fraction_text.rstrip("0")
+        else:
+            fraction_text = fraction_text[:places].ljust(places, "0")
+        return f"{whole}.{fraction_text}" if fraction_text else str(whole)
+
+    def _same_token(self, other) -> bool:
+        # Сравниваются и складываются только суммы с одинаковыми decimals; int не сравнивается
+        return isinstance(other, TokenAmount) and other.decimals == self.decimals
+
+    def __int__(self) -> int:
+        return self.raw
+
+    def __str__(self) -> str:
+        return self.format()
+
+    def __format__(self, spec: str) -> str:
+        # Поддерживаются только спецификаторы вида ".6f", как у чисел в логах
+        if not spec:
+            return self.format()
+        match = FORMAT_SPEC_PATTERN.match(spec)
+        if not match:
+            raise ValueError(f"Неподдерживаемый формат суммы: {spec!r}")
+        return self.format(int(match["places"]))
+
+    def __repr__(self) -> str:
+        return f"TokenAmount({self.format()}, decimals={self.decimals})"
+
+    def __hash__(self) -> int:
+        return hash((self.raw, self.decimals))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TokenAmount):
+            return NotImplemented
+        return self.raw == other.raw and self.decimals == other.decimals
+
+    def __lt__(self, other) -> bool:
+        if not self._same_token(other):
+            return NotImplemented
+        return self.raw < other.raw
+
+    def __le__(self, other) -> bool:
+        if not self._same_token(other):
+            return NotImplemented
+        return self.raw <= other.raw
+
+    def __gt__(self, other) -> bool:
+        if not self._same_token(other):
+            return NotImplemented
+        return self.raw > other.raw
+
+    def __ge__(self, other) -> bool:
+        if not self._same_token(other):
+            return NotImplemented
+        return self.raw >= other.raw
+
+    def __add__(self, other) -> "TokenAmount":
+        if not self._same_token(other):
+            return NotImplemented
+        return TokenAmount(self.raw + other.raw, self.decimals)
+
+    def __sub__(self, other) -> "TokenAmount":
+        if not self._same_token(other):
+            return NotImplemented
+        return TokenAmount(self.raw - other.raw, self.decimals)
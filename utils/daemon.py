@@ -0,0 +1,244 @@
+from utils.deposit import approve_if_needed, supply, deposit_native, native_deposit_gas
+from client.engine import ChainRegistry, WalletContext
+from client.client import Client
+from client.ratelimit import RateLimitedError
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import json
+import os
+
+logger = logging.getLogger('zeroland')
+
+EventSink = Callable[[dict], Awaitable[None]]
+
+SUPPORTED_TOKENS = ("USDC", "ETH")
+
+
+class DepositDaemon:
+    """
+    Долгоживущий процесс депозитов: движок сети, подключения, кэши и nonce
+    остаются «тёплыми» между задачами.
+
+    Задача — JSON-объект `{"id": ..., "wallet": <имя ключа из PRIVATE_KEYS или адрес>,
+    "amount": ..., "network": ..., "token": "USDC" | "ETH"}`; без `network` и `token`
+    используются значения по умолчанию. Задачи принимаются через Unix-сокет (по строке
+    JSON на задачу, статусы возвращаются в то же соединение) или из дописываемого
+    JSONL-файла (статусы пишутся в `events_path`). Задачи одного кошелька в сети
+    выполняются по очереди, остальные — параллельно в пределах лимита своей сети.
+    """
+
+    def __init__(self, registry: ChainRegistry, private_keys: Dict[str, str], default_network: str,
+                 proxy: Optional[str] = None, events_path: str = "data/daemon_events.jsonl",
+                 default_token: str = "USDC"):
+        self.registry = registry
+        self.default_network = default_network
+        self.default_token = default_token.upper()
+        self.proxy = proxy
+        self.events_path = events_path
+        self.clients: Dict[tuple[str, str], Client] = {}
+        self.locks: Dict[tuple[str, str], asyncio.Lock] = {}
+        self.tasks: set = set()
+
+        # Адреса выводятся из ключей один раз, дальше кошельки ищутся по имени или адресу
+        self.keys: Dict[str, tuple[str, str]] = {}
+        for name, private_key in private_keys.items():
+            address = WalletContext(private_key).address
+            self.keys[name] = (private_key, address)
+            self.keys[address.lower()] = (private_key, address)
+
+    # Клиент кошелька в сети (свой nonce в каждой сети)
+    async def find_client(self, network: str, wallet: str) -> Optional[Client]:
+        key = self.keys.get(wallet) or self.keys.get(wallet.lower())
+        if key is None:
+            return None
+        private_key, address = key
+        if (network, address) not in self.clients:
+            engine = await self.registry.get(network)
+            # Пока создавался движок, клиент мог появиться из параллельной задачи
+            if (network, address) not in self.clients:
+                self.clients[(network, address)] = Client(engine, WalletContext(private_key, self.proxy, address))
+                self.locks[(network, address)] = asyncio.Lock()
+        return self.clients[(network, address)]
+
+    # Выполнение одной задачи депозита с отправкой статусов
+    async def run_job(self, job: dict, emit: EventSink) -> None:
+        job_id = job.get("id")
+
+        async def status(name: str, **fields) -> None:
+            await emit({"id": job_id, "status": name, **fields})
+
+        network = str(job.get("network") or self.default_network).upper()
+        token = str(job.get("token") or self.default_token).upper()
+        if token not in SUPPORTED_TOKENS:
+            await status("failed", error=f"Неподдерживаемый токен: {token}")
+            return
+        try:
+            client = await self.find_client(network, str(job.get("wallet", "")))
+        except ValueError as e:
+            await status("failed", error=str(e))
+            return
+        if client is None:
+            await status("failed", error=f"Неизвестный кошелёк: {job.get('wallet')}")
+            return
+
+        try:
+            # Сумма ETH разбирается с 18 знаками, USDC — с decimals токена
+            amount_in = await client.to_wei_main(job["amount"], None if token == "ETH" else client.usdc_address)
+        except (KeyError, TypeError, ValueError) as e:
+            await status("failed", error=f"Некорректная сумма: {e}")
+            return
+        except RateLimitedError as e:
+            await status("throttled", error=str(e), retry_after=e.retry_after)
+            return
+
+        await status("accepted", wallet=client.address, network=network, token=token)
+        async with self.locks[(network, client.address)], client.engine.semaphore:
+            try:
+                if token == "ETH":
+                    await self.deposit_eth(client, amount_in, status)
+                else:
+                    await self.deposit_usdc(client, amount_in, status)
+            except RateLimitedError as e:
+                logger.warning(f"⏳ Задача {job_id}: {e}")
+                client.wallet.nonce = None
+                await status("throttled", error=str(e), retry_after=e.retry_after)
+            except Exception as e:
+                logger.error(f"❌ Задача {job_id} завершилась с ошибкой: {e}")
+                client.wallet.nonce = None
+                await status("failed", error=str(e))
+
+    # Депозит USDC: аппрув, supply и ожидание подтверждения
+    async def deposit_usdc(self, client: Client, amount_in: int, status: Callable[..., Awaitable[None]]) -> None:
+        balance = await client.get_erc20_balance()
+        if amount_in > balance:
+            await status("failed", error="Недостаточно баланса USDC", balance=balance, required=amount_in)
+            return
+
+        await status("approving")
+        await approve_if_needed(client, amount_in)
+
+        tx_hash = await supply(client, amount_in)
+        if tx_hash is None:
+            await status("failed", error="Транзакция не отправлена")
+            return
+        await status("sent", tx_hash=tx_hash)
+
+        if await client.wait_tx(tx_hash, client.explorer_url):
+            await status("confirmed", tx_hash=tx_hash)
+        else:
+            # Транзакция могла выпасть из mempool — следующая задача запросит nonce у сети
+            client.wallet.nonce = None
+            await status("failed", tx_hash=tx_hash, error="Транзакция не выполнена")
+
+    # Депозит ETH: wrap, approve WETH и supply с резервом под газ по лимитам транзакций
+    async def deposit_eth(self, client: Client, amount_in: int, status: Callable[..., Awaitable[None]]) -> None:
+        fees, gas = await native_deposit_gas(client, amount_in)
+        balance = await client.get_native_balance()
+        if balance < amount_in + gas:
+            await status("failed", error="Недостаточно ETH для депозита и газа", balance=balance,
+                         required=amount_in + gas)
+            return
+
+        await status("wrapping")
+        if await deposit_native(client, amount_in, fees):
+            await status("confirmed")
+        else:
+            # Транзакции могли выпасть из mempool — следующая задача запросит nonce у сети
+            client.wallet.nonce = None
+            await status("failed", error="Депозит ETH не выполнен")
+
+    # Разбор строки задачи: ожидается JSON-объект
+    @staticmethod
+    def parse_job(line) -> dict:
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Некорректный JSON: {e}")
+        if not isinstance(job, dict):
+            raise ValueError(f"Задача должна быть JSON-объектом, получено: {type(job).__name__}")
+        return job
+
+    def submit(self, job: dict, emit: EventSink) -> asyncio.Task:
+        task = asyncio.create_task(self.run_job(job, emit))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    # Запись статуса в JSONL-файл событий
+    async def write_event(self, event: dict) -> None:
+        logger.info(f"📨 {event}")
+        os.makedirs(os.path.dirname(self.events_path) or ".", exist_ok=True)
+        with open(self.events_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    # Обработка подключения к Unix-сокету
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+
+        async def emit(event: dict) -> None:
+            logger.info(f"📨 {event}")
+            # Отключение клиента не должно прерывать задачи, транзакции которых уже отправлены
+            if writer.is_closing():
+                return
+            async with write_lock:
+                try:
+                    writer.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                    await writer.drain()
+                except ConnectionError as e:
+                    logger.warning(f"⚠️ Клиент сокета отключился, статус не доставлен: {e}")
+
+        jobs = []
+        try:
+            while line := await reader.readline():
+                try:
+                    job = self.parse_job(line)
+                except ValueError as e:
+                    await emit({"status": "failed", "error": str(e)})
+                    continue
+                jobs.append(self.submit(job, emit))
+            # Клиент закончил отправку — дожидаемся его задач, чтобы отдать все статусы
+            await asyncio.gather(*jobs, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serve_socket(self, path: str) -> None:
+        if os.path.exists(path):
+            os.remove(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Задачи тратят газ кошельков — сокет доступен только владельцу процесса (umask закрывает
+        # окно между созданием сокета и chmod)
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.handle_connection, path=path)
+        finally:
+            os.umask(umask)
+        os.chmod(path, 0o600)
+        logger.info(f"🔌 Демон слушает {path}")
+        async with server:
+            await server.serve_forever()
+
+    # Чтение новых строк из дописываемого JSONL-файла
+    async def tail_jsonl(self, path: str, from_start: bool = False, poll_interval: float = 1) -> None:
+        position = 0 if from_start or not os.path.exists(path) else os.path.getsize(path)
+        logger.info(f"👀 Демон читает задачи из {path}")
+        buffer = ""
+        while True:
+            if os.path.exists(path):
+                if os.path.getsize(path) < position:
+                    # Файл был пересоздан
+                    position = 0
+                with open(path, "r", encoding="utf-8") as file:
+                    file.seek(position)
+                    buffer += file.read()
+                    position = file.tell()
+
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        self.submit(self.parse_job(line), self.write_event)
+                    except ValueError as e:
+                        await self.write_event({"status": "failed", "error": str(e)})
+            await asyncio.sleep(poll_interval)
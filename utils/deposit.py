@@ -0,0 +1,112 @@
+from utils.wrappers import WRAPPED_TOKENS, WRAP_GAS_LIMIT
+from client.engine import ERC20_ABI, POOL_ABI
+from client.client import Client
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger('zeroland')
+
+# supply нельзя оценить до исполнения wrap (WETH ещё нет на балансе), поэтому лимит газа фиксированный
+SUPPLY_GAS_LIMIT = 350_000
+# Лимит газа approve WETH фиксирован, чтобы резерв под газ был известен до отправки
+APPROVE_GAS_LIMIT = 100_000
+
+
+# Аппрув USDC для пула, если текущего allowance не хватает
+async def approve_if_needed(client: Client, amount_in: int) -> None:
+    current_allowance = await client.get_allowance(client.usdc_address, client.address, client.pool_address)
+
+    if current_allowance < amount_in:
+        logger.info(f"⚙️ Требуется апрув для USDC. Текущий allowance: "
+                    f"{await client.from_wei_main(current_allowance, client.usdc_address):.6f}\n")
+        usdc_contract = await client.get_contract(client.usdc_address, abi=ERC20_ABI)
+        await client.approve_usdc(usdc_contract, client.pool_address, (2**256)-1, False)
+    else:
+        logger.info(f"✅ Текущий апрув достаточен: "
+                    f"{await client.from_wei_main(current_allowance, client.usdc_address):.6f}\n")
+
+
+# Сборка, подпись и отправка транзакции supply в пул ZeroLend
+async def supply(client: Client, amount_in: int) -> Optional[str]:
+    core = await client.get_contract(client.pool_address, abi=POOL_ABI)
+
+    logger.info("⚙️ Собираем и подписываем транзакцию депозита...\n")
+    tx = await core.functions.supply(client.usdc_address, amount_in, client.address, 0).build_transaction(
+        await client.prepare_tx(0))
+
+    return await client.sign_and_send_tx(tx)
+
+
+# Полный цикл депозита: аппрув, supply и ожидание подтверждения
+async def deposit(client: Client, amount_in: int) -> bool:
+    await approve_if_needed(client, amount_in)
+    tx_hash = await supply(client, amount_in)
+    if tx_hash is None:
+        return False
+    return await client.wait_tx(tx_hash, client.explorer_url)
+
+
+# Адрес WETH сети для депозита нативного ETH
+def wrapped_address(client: Client) -> str:
+    weth_address = client.engine.weth_address or WRAPPED_TOKENS.get(client.network.name)
+    if not weth_address:
+        raise ValueError(f"Сеть {client.network.name} не поддерживается для wrap операций")
+    return client.w3.to_checksum_address(weth_address)
+
+
+# Комиссия и резерв ETH под газ для deposit_native: лимиты газа всех транзакций × общий maxFeePerGas
+async def native_deposit_gas(client: Client, amount_wei: int) -> tuple[dict, int]:
+    """
+    Возвращает поля комиссии, с которыми нужно вызвать `deposit_native`, и максимум,
+    который спишут её транзакции. Нода проверяет каждую транзакцию очереди против баланса,
+    оставшегося после предыдущих, поэтому резерв считается по лимитам, а не по оценке газа.
+    """
+    fees = client.fee_fields(await client.prepare_tx(0))
+    gas_limit = WRAP_GAS_LIMIT + SUPPLY_GAS_LIMIT
+    if await client.get_allowance(wrapped_address(client), client.address, client.pool_address) < amount_wei:
+        gas_limit += APPROVE_GAS_LIMIT
+    return fees, gas_limit * client.max_fee_per_gas(fees)
+
+
+# Депозит нативного ETH: wrap → approve WETH (если нужно) → supply
+async def deposit_native(client: Client, amount_wei: int, fees: Optional[dict] = None) -> bool:
+    """
+    Оборачивает ETH в WETH и вносит его в пул ZeroLend.
+
+    Транзакции отправляются подряд на последовательные nonce без ожидания
+    между ними и подтверждаются вместе, поэтому депозит занимает около одного блока.
+    Все транзакции используют одни `fees` (см. `native_deposit_gas`) и фиксированные лимиты газа.
+    """
+    weth_address = wrapped_address(client)
+    if fees is None:
+        fees = client.fee_fields(await client.prepare_tx(0))
+
+    logger.info("⚙️ Отправляем wrap ETH → WETH...\n")
+    wrap_hash = await client.wrap_native(amount_wei, fees)
+    if wrap_hash is None:
+        return False
+    tx_hashes = [wrap_hash]
+
+    allowance = await client.get_allowance(weth_address, client.address, client.pool_address)
+    if allowance < amount_wei:
+        logger.info("⚙️ Отправляем апрув WETH для пула...\n")
+        weth_contract = await client.get_contract(weth_address, abi=ERC20_ABI)
+        approve_tx = await weth_contract.functions.approve(client.pool_address, (2**256)-1).build_transaction(
+            {**await client.prepare_tx(0), **fees, "gas": APPROVE_GAS_LIMIT})
+        approve_hash = await client.sign_and_send_tx(approve_tx, without_gas=True)
+        if approve_hash is None:
+            await client.wait_tx(wrap_hash, client.explorer_url)
+            return False
+        tx_hashes.append(approve_hash)
+
+    logger.info("⚙️ Отправляем supply WETH...\n")
+    core = await client.get_contract(client.pool_address, abi=POOL_ABI)
+    supply_tx = await core.functions.supply(weth_address, amount_wei, client.address, 0).build_transaction(
+        {**await client.prepare_tx(0), **fees, "gas": SUPPLY_GAS_LIMIT})
+    supply_hash = await client.sign_and_send_tx(supply_tx, without_gas=True)
+    if supply_hash is not None:
+        tx_hashes.append(supply_hash)
+
+    results = await asyncio.gather(*(client.wait_tx(tx_hash, client.explorer_url) for tx_hash in tx_hashes))
+    return supply_hash is not None and all(results)
@@ -0,0 +1,129 @@
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional
+from web3 import AsyncWeb3
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger('zeroland')
+
+
+@dataclass
+class FeeJob:
+    """Отложенная задача (например, депозит), которая запускается при низком base fee"""
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    deadline: float
+    result: Any = None
+    error: Optional[BaseException] = None
+    released_at: Optional[float] = None
+    base_fee: Optional[int] = None
+    forced: bool = False
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class FeeScheduler:
+    """
+    Планировщик задач по базовой комиссии сети.
+
+    Задачи выпускаются, только когда base fee следующего блока не превышает порог:
+    фиксированный потолок `max_base_fee` (в wei) или перцентиль `percentile`
+    по скользящему окну `fee_history` из `window` блоков. Когда окно открыто,
+    очередь разбирается со скоростью `rate` задач в секунду. Задачи, у которых
+    наступил дедлайн, запускаются независимо от комиссии.
+    """
+
+    def __init__(self, w3: AsyncWeb3, max_base_fee: Optional[int] = None, percentile: Optional[float] = None,
+                 window: int = 20, rate: float = 1.0, deadline: float = 3600, poll_interval: float = 12):
+        if max_base_fee is None and percentile is None:
+            raise ValueError("Нужно указать max_base_fee или percentile")
+        if percentile is not None and not 0 <= percentile <= 100:
+            raise ValueError("percentile должен быть в диапазоне 0..100")
+        self.w3 = w3
+        self.max_base_fee = max_base_fee
+        self.percentile = percentile
+        self.window = window
+        self.rate = rate
+        self.deadline = deadline
+        self.poll_interval = poll_interval
+        self.queue: List[FeeJob] = []
+        self.running: set = set()
+
+    # Добавление задачи в очередь
+    def submit(self, name: str, run: Callable[[], Awaitable[Any]], deadline: Optional[float] = None) -> FeeJob:
+        job = FeeJob(name=name, run=run, deadline=time.time() + (self.deadline if deadline is None else deadline))
+        self.queue.append(job)
+        return job
+
+    @staticmethod
+    def percentile_of(values: List[int], percentile: float) -> int:
+        """Перцентиль по методу ближайшего ранга"""
+        ordered = sorted(values)
+        rank = max(0, min(len(ordered) - 1, round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[rank]
+
+    # Текущий base fee (следующего блока) и порог выпуска задач
+    async def get_fee_window(self) -> tuple[int, int]:
+        fee_history = await self.w3.eth.fee_history(self.window, "latest")
+        base_fees = fee_history["baseFeePerGas"]
+        current_base_fee = base_fees[-1]
+
+        thresholds = []
+        if self.max_base_fee is not None:
+            thresholds.append(self.max_base_fee)
+        if self.percentile is not None:
+            thresholds.append(self.percentile_of(base_fees[:-1] or base_fees, self.percentile))
+        return current_base_fee, min(thresholds)
+
+    async def _execute(self, job: FeeJob, base_fee: Optional[int]) -> None:
+        job.released_at = time.time()
+        job.base_fee = base_fee
+        try:
+            job.result = await job.run()
+        except Exception as e:
+            job.error = e
+            logger.error(f"❌ Задача {job.name} завершилась с ошибкой: {e}")
+        finally:
+            job.done.set()
+
+    def _release(self, job: FeeJob, base_fee: Optional[int], forced: bool) -> None:
+        self.queue.remove(job)
+        job.forced = forced
+        task = asyncio.create_task(self._execute(job, base_fee))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    # Основной цикл: ждём окна с низкой комиссией и разбираем очередь
+    async def run(self) -> List[FeeJob]:
+        jobs = list(self.queue)
+        interval = 1 / self.rate if self.rate > 0 else 0
+
+        while self.queue:
+            try:
+                base_fee, threshold = await self.get_fee_window()
+            except Exception as e:
+                # Комиссия неизвестна: задачи ждут, но дедлайн всё равно соблюдается
+                logger.warning(f"⚠️ Не удалось получить fee_history: {e}")
+                base_fee = threshold = None
+
+            now = time.time()
+            for job in [job for job in self.queue if job.deadline <= now]:
+                logger.warning(f"⏰ Дедлайн задачи {job.name}: запускаем при base fee {base_fee}")
+                self._release(job, base_fee, forced=True)
+
+            if self.queue and base_fee is not None and base_fee <= threshold:
+                logger.info(f"🟢 Base fee {base_fee} <= порога {threshold}, разбираем очередь ({len(self.queue)})")
+                window_closes_at = time.time() + self.poll_interval
+                while self.queue and time.time() < window_closes_at:
+                    self._release(self.queue[0], base_fee, forced=False)
+                    await asyncio.sleep(interval)
+                continue
+
+            if self.queue:
+                if base_fee is not None:
+                    logger.info(f"⏳ Base fee {base_fee} выше порога {threshold}, ожидание ({len(self.queue)} в очереди)")
+                await asyncio.sleep(self.poll_interval)
+
+        if self.running:
+            await asyncio.gather(*self.running, return_exceptions=True)
+        return jobs
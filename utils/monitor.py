@@ -0,0 +1,181 @@
+from client.engine import ChainEngine, ERC20_ABI, POOL_ABI
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger('zeroland')
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+# Индекс aTokenAddress в структуре ReserveData
+RESERVE_ATOKEN_INDEX = 8
+ACCOUNT_DATA_TYPES = ["uint256"] * 6
+HEALTH_FACTOR_DECIMALS = 10 ** 18
+# Суммы *Base у Aave-подобных пулов — в USD с 8 знаками
+BASE_CURRENCY_DECIMALS = 8
+
+
+class Position(NamedTuple):
+    """Снимок позиции кошелька в блоке"""
+    block: int
+    collateral: int
+    debt: int
+    health_factor: int
+    atoken_balance: int
+
+
+class PositionMonitor:
+    """
+    Периодический мониторинг позиций кошельков в ZeroLend.
+
+    Раз в блок читает `getUserAccountData` и баланс aToken пачками через Multicall3:
+    не больше `max_calls_per_block` RPC-вызовов по `batch_size` кошельков в каждом,
+    кошельки обходятся по кругу. Наружу отдаются только строки, изменившиеся больше
+    порога: `relative_threshold` для залога, долга и баланса и `health_factor_threshold`
+    для health factor. Для каждого кошелька хранится `history` последних снимков.
+    """
+
+    def __init__(self, engine: ChainEngine, addresses: List[str], multicall_address: str = MULTICALL3_ADDRESS,
+                 batch_size: int = 200, max_calls_per_block: int = 2, relative_threshold: float = 0.001,
+                 health_factor_threshold: float = 0.01, history: int = 256, block_timeout: float = 15):
+        self.engine = engine
+        self.addresses = list(addresses)
+        self.multicall_address = multicall_address
+        self.batch_size = batch_size
+        self.max_calls_per_block = max_calls_per_block
+        self.relative_threshold = relative_threshold
+        self.health_factor_threshold = int(health_factor_threshold * HEALTH_FACTOR_DECIMALS)
+        self.block_timeout = block_timeout
+        self.series: Dict[str, Deque[Position]] = {address: deque(maxlen=history) for address in self.addresses}
+        self.atoken_address: Optional[str] = None
+        self._cursor = 0
+
+    # Адрес aToken для USDC из данных резерва пула
+    async def resolve_atoken(self) -> str:
+        pool = self.engine.contract(self.engine.pool_address, POOL_ABI)
+        reserve = await pool.functions.getReserveData(self.engine.usdc_address).call()
+        self.atoken_address = reserve[RESERVE_ATOKEN_INDEX]
+        return self.atoken_address
+
+    # Следующая порция кошельков в пределах RPC-бюджета на блок
+    def next_batches(self) -> List[List[str]]:
+        per_block = min(len(self.addresses), self.batch_size * self.max_calls_per_block)
+        selected = [self.addresses[(self._cursor + i) % len(self.addresses)] for i in range(per_block)]
+        self._cursor = (self._cursor + per_block) % len(self.addresses)
+        return [selected[i:i + self.batch_size] for i in range(0, len(selected), self.batch_size)]
+
+    # Один вызов Multicall3 для пачки кошельков
+    async def read_batch(self, addresses: List[str], block: int) -> List[Optional[Position]]:
+        pool = self.engine.contract(self.engine.pool_address, POOL_ABI)
+        atoken = self.engine.contract(self.atoken_address, ERC20_ABI)
+        multicall = self.engine.contract(self.multicall_address, MULTICALL3_ABI)
+
+        calls = []
+        for address in addresses:
+            calls.append((self.engine.pool_address, True,
+                          pool.encodeABI(fn_name="getUserAccountData", args=[address])))
+            calls.append((self.atoken_address, True, atoken.encodeABI(fn_name="balanceOf", args=[address])))
+
+        results = await multicall.functions.aggregate3(calls).call(block_identifier=block)
+        codec = self.engine.w3().codec
+
+        positions = []
+        for i in range(len(addresses)):
+            (account_ok, account_data), (balance_ok, balance_data) = results[2 * i], results[2 * i + 1]
+            if not account_ok or not balance_ok:
+                positions.append(None)
+                continue
+            collateral, debt, _, _, _, health_factor = codec.decode(ACCOUNT_DATA_TYPES, account_data)
+            (balance,) = codec.decode(["uint256"], balance_data)
+            positions.append(Position(block, collateral, debt, health_factor, balance))
+        return positions
+
+    def _changed(self, old: int, new: int) -> bool:
+        if old == new:
+            return False
+        if old == 0:
+            return True
+        return abs(new - old) / old > self.relative_threshold
+
+    def is_significant(self, previous: Optional[Position], current: Position) -> bool:
+        """Изменилась ли позиция больше порогов"""
+        if previous is None:
+            return True
+        return (self._changed(previous.collateral, current.collateral)
+                or self._changed(previous.debt, current.debt)
+                or self._changed(previous.atoken_balance, current.atoken_balance)
+                or abs(current.health_factor - previous.health_factor) > self.health_factor_threshold)
+
+    # Чтение порции кошельков и отбор изменившихся позиций
+    async def poll(self) -> List[tuple[str, Position]]:
+        if self.engine.transport and self.engine.transport.block_number is not None:
+            block = self.engine.transport.block_number
+        else:
+            block = await self.engine.w3().eth.block_number
+        batches = self.next_batches()
+        results = await asyncio.gather(*(self.read_batch(batch, block) for batch in batches), return_exceptions=True)
+
+        changes = []
+        for batch, positions in zip(batches, results):
+            if isinstance(positions, Exception):
+                logger.warning(f"⚠️ Ошибка чтения позиций ({len(batch)} кошельков): {positions}")
+                continue
+            for address, position in zip(batch, positions):
+                if position is None:
+                    continue
+                series = self.series[address]
+                previous = series[-1] if series else None
+                if self.is_significant(previous, position):
+                    series.append(position)
+                    changes.append((address, position))
+        return changes
+
+    # Основной цикл: одна порция кошельков на каждый новый блок
+    async def run(self, on_change: Callable[[str, Position], Optional[Awaitable[None]]]) -> None:
+        if not self.addresses:
+            return
+        if self.atoken_address is None:
+            await self.resolve_atoken()
+        # Номер блока берётся из транспорта, поэтому дожидаемся первой головы
+        if self.engine.transport and self.engine.transport.block_number is None:
+            await self.engine.wait_next_block(self.block_timeout)
+
+        while True:
+            try:
+                for address, position in await self.poll():
+                    result = on_change(address, position)
+                    if asyncio.iscoroutine(result):
+                        await result
+            except Exception as e:
+                logger.error(f"❌ Ошибка мониторинга позиций: {e}")
+            await self.engine.wait_next_block(self.block_timeout)
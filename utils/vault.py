@@ -0,0 +1,231 @@
+from Crypto.Protocol.KDF import scrypt
+from Crypto.Random import get_random_bytes
+from Crypto.Cipher import AES
+from client.engine import POOL_ABI
+from client.client import Client
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import json
+import time
+import os
+
+logger = logging.getLogger('zeroland')
+
+MAX_UINT256 = 2 ** 256 - 1
+VAULT_PATH = "data/emergency_vault.bin"
+WITHDRAW_GAS_MULTIPLIER = 1.5
+# Запас по базовой комиссии при подписи: транзакция должна пройти даже при резком росте газа
+FEE_MULTIPLIER = 3
+# Транзакция считается устаревшей, если её maxFee не покрывает текущий base fee с этим запасом
+STALE_FEE_MULTIPLIER = 1.5
+SALT_SIZE = 16
+NONCE_SIZE = 12
+TAG_SIZE = 16
+
+
+class EmergencyVault:
+    """
+    Хранилище заранее подписанных транзакций withdraw(asset, max, to) для экстренного вывода.
+
+    Транзакции подписываются на зарезервированный nonce каждого кошелька и хранятся
+    на диске в зашифрованном виде (AES-GCM, ключ выводится из пароля через scrypt).
+    """
+
+    def __init__(self, clients: List[Client], asset_address: str, password: str, path: str = VAULT_PATH):
+        if not password:
+            raise ValueError("Пароль хранилища не задан")
+        self.clients = {client.address: client for client in clients}
+        self.asset_address = asset_address
+        self.password = password.encode("utf-8")
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+
+    # Шифрование и сохранение хранилища на диск
+    def save(self) -> None:
+        salt = get_random_bytes(SALT_SIZE)
+        key = scrypt(self.password, salt, key_len=32, N=2 ** 15, r=8, p=1)
+        cipher = AES.new(key, AES.MODE_GCM, nonce=get_random_bytes(NONCE_SIZE))
+        payload = json.dumps({"asset": self.asset_address, "entries": self.entries}).encode("utf-8")
+        ciphertext, tag = cipher.encrypt_and_digest(payload)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(salt + cipher.nonce + tag + ciphertext)
+        os.replace(tmp_path, self.path)
+        logger.info(f"🔐 Хранилище сохранено: {self.path} ({len(self.entries)} транзакций)")
+
+    # Загрузка и расшифровка хранилища
+    def load(self) -> None:
+        with open(self.path, "rb") as file:
+            blob = file.read()
+
+        salt = blob[:SALT_SIZE]
+        nonce = blob[SALT_SIZE:SALT_SIZE + NONCE_SIZE]
+        tag = blob[SALT_SIZE + NONCE_SIZE:SALT_SIZE + NONCE_SIZE + TAG_SIZE]
+        ciphertext = blob[SALT_SIZE + NONCE_SIZE + TAG_SIZE:]
+
+        key = scrypt(self.password, salt, key_len=32, N=2 ** 15, r=8, p=1)
+        cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+        try:
+            payload = cipher.decrypt_and_verify(ciphertext, tag)
+        except ValueError:
+            raise ValueError("❌ Неверный пароль хранилища или файл повреждён")
+
+        data = json.loads(payload)
+        if data["asset"].lower() != self.asset_address.lower():
+            raise ValueError(f"❌ Хранилище подписано для другого актива: {data['asset']}")
+        self.entries = data["entries"]
+
+    # Текущая базовая комиссия и чаевые
+    @staticmethod
+    async def get_fee_params(client: Client) -> tuple[int, int]:
+        block = await client.w3.eth.get_block("latest")
+        base_fee = block.get("baseFeePerGas") or await client.w3.eth.gas_price
+        max_priority_fee = await client.w3.eth.max_priority_fee
+        return base_fee, max_priority_fee
+
+    # Подпись withdraw-транзакции для одного кошелька
+    async def sign_withdraw(self, client: Client, nonce: int, base_fee: int, max_priority_fee: int) -> Optional[dict]:
+        pool_contract = await client.get_contract(client.pool_address, POOL_ABI)
+        withdraw = pool_contract.functions.withdraw(
+            client.w3.to_checksum_address(self.asset_address), MAX_UINT256, client.address)
+
+        try:
+            gas = int(await withdraw.estimate_gas({"from": client.address}) * WITHDRAW_GAS_MULTIPLIER)
+        except Exception as e:
+            logger.warning(f"⚠️ {client.address}: withdraw не проходит симуляцию, пропуск ({e})")
+            return None
+
+        max_fee = base_fee * FEE_MULTIPLIER + max_priority_fee
+        tx = await withdraw.build_transaction({
+            "from": client.address,
+            "nonce": nonce,
+            "gas": gas,
+            "chainId": client.chain_id,
+            "maxFeePerGas": max_fee,
+            "maxPriorityFeePerGas": max_priority_fee,
+            "type": "0x2",
+        })
+        signed = client.sign(tx)
+
+        return {
+            "nonce": nonce,
+            "max_fee": max_fee,
+            "max_priority_fee": max_priority_fee,
+            "raw_tx": client.w3.to_hex(signed.raw_transaction),
+            "tx_hash": client.w3.to_hex(signed.hash),
+            "signed_at": int(time.time()),
+        }
+
+    @staticmethod
+    def is_stale(entry: dict, nonce: int, base_fee: int) -> bool:
+        """Проверяет, нужно ли переподписать транзакцию под текущий nonce и комиссию"""
+        if entry["nonce"] != nonce:
+            return True
+        return entry["max_fee"] < base_fee * STALE_FEE_MULTIPLIER + entry["max_priority_fee"]
+
+    # Подпись или переподпись транзакции кошелька, если она устарела
+    async def refresh_wallet(self, client: Client, base_fee: int, max_priority_fee: int, force: bool = False) -> bool:
+        nonce = await client.w3.eth.get_transaction_count(client.address, "pending")
+        entry = self.entries.get(client.address)
+        if entry and not force and not self.is_stale(entry, nonce, base_fee):
+            return False
+
+        new_entry = await self.sign_withdraw(client, nonce, base_fee, max_priority_fee)
+        if new_entry is None:
+            self.entries.pop(client.address, None)
+            return entry is not None
+
+        self.entries[client.address] = new_entry
+        logger.info(f"✍️ {client.address}: withdraw подписан на nonce {nonce}")
+        return True
+
+    # Построение или обновление всего хранилища
+    async def refresh(self, force: bool = False) -> int:
+        if not self.clients:
+            return 0
+        base_fee, max_priority_fee = await self.get_fee_params(next(iter(self.clients.values())))
+        results = await asyncio.gather(
+            *(self.refresh_wallet(client, base_fee, max_priority_fee, force) for client in self.clients.values()),
+            return_exceptions=True
+        )
+
+        changed = 0
+        for address, result in zip(self.clients, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ {address}: не удалось обновить withdraw: {result}")
+            elif result:
+                changed += 1
+
+        if changed:
+            self.save()
+        return changed
+
+    # Фоновое переподписание устаревших транзакций
+    async def watch(self, interval: int = 60) -> None:
+        while True:
+            try:
+                changed = await self.refresh()
+                if changed:
+                    logger.info(f"♻️ Переподписано транзакций: {changed}")
+            except Exception as e:
+                logger.error(f"❌ Ошибка при обновлении хранилища: {e}")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def send_raw(client: Client, entry: dict) -> None:
+        if client.broadcaster:
+            await client.broadcaster.send_raw_transaction(entry["raw_tx"], entry["tx_hash"])
+        else:
+            await client.w3.eth.send_raw_transaction(entry["raw_tx"])
+
+    # Отправка одной заранее подписанной транзакции
+    async def broadcast_wallet(self, address: str, entry: dict) -> Optional[str]:
+        client = self.clients.get(address)
+        if client is None:
+            logger.error(f"❌ {address}: нет ключа для кошелька из хранилища")
+            return None
+
+        try:
+            await self.send_raw(client, entry)
+            return entry["tx_hash"]
+        except Exception as e:
+            message = str(e).lower()
+            if "already known" in message:
+                return entry["tx_hash"]
+            if "nonce too low" not in message and "underpriced" not in message and "fee cap" not in message:
+                raise
+
+        # Транзакция устарела — переподписываем на лету и отправляем повторно
+        logger.warning(f"⚠️ {address}: транзакция устарела, переподписываем")
+        base_fee, max_priority_fee = await self.get_fee_params(client)
+        if await self.refresh_wallet(client, base_fee, max_priority_fee, force=True):
+            # На диске должна остаться переподписанная транзакция, а не устаревшая
+            self.save()
+        new_entry = self.entries.get(address)
+        if new_entry is None:
+            return None
+        await self.send_raw(client, new_entry)
+        return new_entry["tx_hash"]
+
+    # Одновременная отправка всех транзакций хранилища
+    async def broadcast(self) -> Dict[str, Optional[str]]:
+        addresses = list(self.entries)
+        entries = [self.entries[address] for address in addresses]
+        results = await asyncio.gather(
+            *(self.broadcast_wallet(address, entry) for address, entry in zip(addresses, entries)),
+            return_exceptions=True
+        )
+
+        tx_hashes = {}
+        for address, result in zip(addresses, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ {address}: ошибка отправки withdraw: {result}")
+                tx_hashes[address] = None
+            else:
+                tx_hashes[address] = result
+                if result:
+                    logger.info(f"🚀 {address}: withdraw отправлен {result}")
+        return tx_hashes
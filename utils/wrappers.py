@@ -1,8 +1,6 @@
 from eth_typing import ChecksumAddress
 from web3 import AsyncWeb3
 from typing import Dict, Any, Optional
-import json
-import os
 import logging
 
 logger = logging.getLogger('zeroland')
@@ -14,6 +12,9 @@ WRAPPED_NATIVE_ADDRESSES = {
     "ARBITRUM": "0x82af49447d8a07e3bd95bd0d56f35241523fbab1"  # WETH
 }
 
+# Обычно wrap и unwrap занимают около 50k газа
+WRAP_GAS_LIMIT = 100_000
+
 WETH_ABI = [
     {
         "constant": False,
@@ -44,7 +45,9 @@ async def wrap_native_token(
     w3: AsyncWeb3, 
     network_name: str, 
     amount_wei: int, 
-    sender_address: str
+    sender_address: str,
+    nonce: Optional[int] = None,
+    wrapped_address: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Оборачивает нативный токен (ETH/BNB/MATIC) в обернутый токен (WETH/WBNB/WMATIC).
@@ -54,21 +57,30 @@ async def wrap_native_token(
         network_name: Название сети
         amount_wei: Количество в wei для обертывания
         sender_address: Адрес отправителя
+        nonce: Nonce транзакции (по умолчанию запрашивается у сети)
+        wrapped_address: Адрес обернутого токена (по умолчанию из WRAPPED_TOKENS)
         
     Returns:
         Dict[str, Any]: Транзакция для подписи
     """
     try:
-        if network_name not in WRAPPED_TOKENS:
+        wrapped_address = wrapped_address or WRAPPED_TOKENS.get(network_name)
+        if not wrapped_address:
             raise ValueError(f"Сеть {network_name} не поддерживается для wrap операций")
-            
-        # Формируем базовые параметры транзакции
+
+        contract = w3.eth.contract(
+            address=w3.to_checksum_address(wrapped_address),
+            abi=WETH_ABI
+        )
+
+        # Формируем базовые параметры транзакции с вызовом deposit()
         tx_params = {
             'from': sender_address,
-            'to': w3.to_checksum_address(WRAPPED_TOKENS[network_name]),
+            'to': w3.to_checksum_address(wrapped_address),
+            'data': contract.encodeABI(fn_name="deposit"),
             'value': amount_wei,
-            'nonce': await w3.eth.get_transaction_count(sender_address),
-            'gas': 100000,  # Обычно wrap занимает около 50k газа
+            'nonce': nonce if nonce is not None else await w3.eth.get_transaction_count(sender_address, "pending"),
+            'gas': WRAP_GAS_LIMIT,
             'chainId': await w3.eth.chain_id
         }
         
@@ -96,7 +108,9 @@ async def unwrap_native_token(
     w3: AsyncWeb3, 
     network_name: str, 
     amount_wei: int, 
-    sender_address: str
+    sender_address: str,
+    nonce: Optional[int] = None,
+    wrapped_address: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Разворачивает обернутый токен (WETH/WBNB/WMATIC) обратно в нативный токен (ETH/BNB/MATIC).
@@ -106,29 +120,21 @@ async def unwrap_native_token(
         network_name: Название сети
         amount_wei: Количество в wei для разворачивания
         sender_address: Адрес отправителя
+        nonce: Nonce транзакции (по умолчанию запрашивается у сети)
+        wrapped_address: Адрес обернутого токена (по умолчанию из WRAPPED_TOKENS)
         
     Returns:
         Dict[str, Any]: Транзакция для подписи
     """
     try:
-        if network_name not in WRAPPED_TOKENS:
+        wrapped_address = wrapped_address or WRAPPED_TOKENS.get(network_name)
+        if not wrapped_address:
             raise ValueError(f"Сеть {network_name} не поддерживается для unwrap операций")
             
-        # Загружаем ABI для WETH
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        abi_path = os.path.join(os.path.dirname(current_dir), "abi", "weth_abi.json")
-        
-        try:
-            with open(abi_path, "r", encoding="utf-8") as f:
-                weth_abi = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"Не удалось загрузить ABI для WETH: {e}")
-            raise
-            
         # Создаем контракт
         contract = w3.eth.contract(
-            address=w3.to_checksum_address(WRAPPED_TOKENS[network_name]), 
-            abi=weth_abi
+            address=w3.to_checksum_address(wrapped_address), 
+            abi=WETH_ABI
         )
         
         # Формируем данные для вызова функции withdraw
@@ -137,11 +143,11 @@ async def unwrap_native_token(
         # Формируем базовые параметры транзакции
         tx_params = {
             'from': sender_address,
-            'to': w3.to_checksum_address(WRAPPED_TOKENS[network_name]),
+            'to': w3.to_checksum_address(wrapped_address),
             'data': function_data,
             'value': 0,
-            'nonce': await w3.eth.get_transaction_count(sender_address),
-            'gas': 100000,
+            'nonce': nonce if nonce is not None else await w3.eth.get_transaction_count(sender_address, "pending"),
+            'gas': WRAP_GAS_LIMIT,
             'chainId': await w3.eth.chain_id
         }
         